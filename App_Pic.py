@@ -1,51 +1,88 @@
 import os
-import requests
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from ai_client import get_openai_client
+from remote_cache import get_session
+from image_cache import get_image_cache, image_key
+
+DOWNLOAD_TIMEOUT = (5, 30)  # (connect, read) seconds
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_WORKERS = 8
 
 # Load environment variables
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-def download_image(filename, url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(filename, 'wb') as file:
-            file.write(response.content)
-    else:
-        print("Error downloading image from URL:", url)
-
-def filename_from_input(prompt):
-    # Remove all non-alphanumeric characters from the prompt except spaces.
-    alphanum = ""
-    for character in prompt:
-        if character.isalnum() or character == " ":
-            alphanum += character
-    # Split the alphanumeric prompt into words.
-    alphanum_split = alphanum.split()
-    if len(alphanum_split) > 3:
-        alphanum_split = alphanum_split[:3]
-    # Join the words with underscores and return the result.
-    return "images/" + "_".join(alphanum_split)
-
-def get_image(prompt, model="dall-e-2"):
-    n = 2  # Number of images to generate
+client = get_openai_client()
+
+def download_image(filename, url, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Stream `url` to `filename` in chunks over the shared session.
+
+    The body goes to a temporary file that is renamed into place only once
+    complete, so readers never see a partial image. Returns True on success.
+    """
+    tmp_path = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with get_session().get(url, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                print("Error downloading image from URL:", url)
+                return False
+            with open(tmp_path, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+        os.replace(tmp_path, filename)
+        return True
+    except Exception as e:
+        print(f"Error downloading image from URL: {url} ({e})")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+def download_images(downloads, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Download (filename, url) pairs concurrently, so a batch takes about as
+    long as its slowest image. Returns the success flag of each download.
+    """
+    downloads = list(downloads)
+    if len(downloads) <= 1:
+        return [download_image(filename, url, timeout) for filename, url in downloads]
+    workers = min(MAX_DOWNLOAD_WORKERS, len(downloads))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: download_image(item[0], item[1], timeout), downloads))
+
+def get_image(prompt, model="dall-e-2", size="1024x1024", n=2):
+    """
+    Generate `n` images for `prompt` and return their local file paths.
+
+    Images live in the content-addressed image cache, so a prompt that was
+    already rendered with the same model, size and n is served from disk
+    without calling the API.
+    """
+    cache = get_image_cache()
+    key = image_key(prompt, model, size, n)
+    paths = cache.get(key)
+    if paths is not None:
+        return paths
 
     # Generate images using new API format
     image_response = client.images.generate(
         model=model,
         prompt=prompt,
         n=n,
-        size="1024x1024"
+        size=size
     )
 
-    # Ensure images directory exists
-    os.makedirs("images", exist_ok=True)
-
-    # Save images and return response
-    for i in range(n):
-        filename = filename_from_input(prompt) + "_" + str(i + 1) + ".png"
-        download_image(filename, image_response.data[i].url)
+    # Download in parallel, then move into the cache
+    downloads = [
+        (cache.temp_path(f"{key[:16]}_{i + 1}.png"), image.url)
+        for i, image in enumerate(image_response.data)
+    ]
+    ok = download_images(downloads)
+    if not all(ok):
+        for filename, _ in downloads:
+            if os.path.exists(filename):
+                os.remove(filename)
+        raise RuntimeError(f"Could not download the generated images for: {prompt}")
 
-    return image_response
\ No newline at end of file
+    return cache.put(key, [filename for filename, _ in downloads], prompt=prompt, model=model, size=size)
@@ -1,7 +1,6 @@
 # Tiffany Duong - worked on lines ~532-900. Worked on AI Assistant and 911 emergency features
 
 import streamlit as st
-from openai import OpenAI
 
 # This MUST be the first Streamlit command
 st.set_page_config(
@@ -14,17 +13,30 @@ st.set_page_config(
 # Regular imports without speech recognition
 import sys
 import subprocess
-from datetime import datetime
 import requests
 import os
 from dotenv import load_dotenv
 from safety_tips import SafetyTipsGenerator
+from dataset_schema import read_incidents
+from incident_stream import IncidentSummary, stream_incident_summary
+from incident_cube import IncidentCube
+from incident_ingest import IncrementalIncidentLoader
+from weather import enrich_with_weather, synthetic_weather_rows
+from remote_cache import read_remote_csv
+from road_data import read_road_csv
+from road_risk import RoadRiskIndex
+from assistant import answer_question, stream_answer
+from conversation import Conversation
+from quiz_store import get_quiz_store
+from report_store import get_report_store
+from telematics import VehicleDetector, simulate_drive, speed_limits_from_roads
+from telemetry_service import get_telemetry_service
 import pandas as pd
 import numpy as np
 import ssl
-import json
 import random
 import time
+import uuid
 import plotly.express as px
 ssl._create_default_https_context = ssl._create_unverified_context
 
@@ -32,7 +44,22 @@ ssl._create_default_https_context = ssl._create_unverified_context
 load_dotenv()
 
 # Your existing functions here
-@st.cache_data
+WEATHER_SEED = 2024
+WEATHER_CHUNK_SIZE = 10_000
+
+def _attach_weather(driving_data):
+    """Add synthetic weather columns to a block of incident rows"""
+    # Weather is keyed on global row position, so every worker sees the same
+    # weather however the file was split into blocks
+    start = int(driving_data.index[0]) if len(driving_data) else 0
+    weather = synthetic_weather_rows(start, start + len(driving_data), WEATHER_CHUNK_SIZE, WEATHER_SEED)
+    return enrich_with_weather(driving_data, weather=weather)
+
+@st.cache_resource
+def get_incident_loader(path="synthetic_traffic_fatalities.csv"):
+    """Process-wide loader that only parses rows appended since the last refresh"""
+    return IncrementalIncidentLoader(path, reader=read_incidents, enrich=_attach_weather)
+
 def load_and_prepare_data():
     """Load and prepare multiple data sources"""
     try:
@@ -46,16 +73,9 @@ def load_and_prepare_data():
             })
             return dummy_data
         
-        # Primary driving data
-        driving_data = pd.read_csv("synthetic_traffic_fatalities.csv")
-        
-        # Synthetic weather data
-        weather_data = generate_synthetic_weather_data(len(driving_data))
-        
-        # Merge datasets
-        combined_data = pd.merge(driving_data, weather_data, left_index=True, right_index=True)
-        
-        return combined_data
+        # Primary driving data merged with synthetic weather, refreshed
+        # incrementally as new incidents are appended to the file
+        return get_incident_loader().refresh()
     except Exception as e:
         # Return dummy data as fallback
         return pd.DataFrame({
@@ -64,95 +84,112 @@ def load_and_prepare_data():
             'Fatality': [0, 1, 0, 1, 0]
         })
 
-def generate_synthetic_weather_data(size):
-    """Generate synthetic weather data for analysis"""
-    weather_conditions = ['Clear', 'Rain', 'Snow', 'Fog']
-    temperatures = np.random.normal(20, 5, size)
-    conditions = np.random.choice(weather_conditions, size)
-    
-    
-    return pd.DataFrame({
-        'temperature': temperatures,
-        'weather_condition': conditions
-    })
+@st.cache_data
+def load_incident_summary(path="synthetic_traffic_fatalities.csv", chunksize=100_000):
+    """Stream an incident file in chunks and return only the dashboard totals"""
+    return stream_incident_summary(
+        path,
+        chunksize=chunksize,
+        reader=read_incidents,
+        usecols=['DayOfWeek', 'WeatherCondition', 'Fatality']
+    )
+
+def get_incident_cube(path="synthetic_traffic_fatalities.csv"):
+    """Pre-aggregated incident cube, kept current with appended incidents"""
+    loader = get_incident_loader(path)
+    loader.refresh()
+    return loader.cube
 
-def analyze_driving_patterns(df):
-    """Comprehensive driving pattern analysis"""
+def analyze_driving_patterns(data, filters=None):
+    """Comprehensive driving pattern analysis
+
+    Accepts an incident DataFrame, an IncidentSummary from
+    load_incident_summary() for files too large to load at once, or an
+    IncidentCube from get_incident_cube(). With a cube, `filters` such as
+    {'WeatherCondition': 'Rainy'} are answered from pre-aggregated cells.
+    """
     st.subheader("🔍 Driving Pattern Analysis")
     
-    # Convert Fatality to numeric
-    df['Fatality'] = pd.to_numeric(df['Fatality'], errors='coerce').fillna(0)
+    if isinstance(data, IncidentCube):
+        summary = data.summary(**(filters or {}))
+    elif isinstance(data, IncidentSummary):
+        summary = data
+    else:
+        summary = IncidentSummary.from_frame(data)
     
     # Key metrics at the top
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Incidents", len(df))
+        st.metric("Total Incidents", summary.total)
     with col2:
-        fatal_count = df['Fatality'].sum()
-        st.metric("Fatal Incidents", int(fatal_count))
+        st.metric("Fatal Incidents", summary.fatal)
     with col3:
-        fatality_rate = (fatal_count / len(df)) * 100
-        st.metric("Fatality Rate", f"{fatality_rate:.1f}%")
+        st.metric("Fatality Rate", f"{summary.fatality_rate:.1f}%")
     
     # Time-based analysis
     col1, col2 = st.columns(2)
     
     with col1:
-        daily_counts = df.groupby('DayOfWeek').size()
+        daily_counts = summary.day_counts
         fig_daily = px.bar(daily_counts, 
                           title='Incidents by Day of Week',
                           labels={'value': 'Number of Incidents', 'index': 'Day'})
         st.plotly_chart(fig_daily)
     
     with col2:
-        weather_counts = df.groupby('WeatherCondition').size()
+        weather_counts = summary.weather_counts
         fig_weather = px.pie(values=weather_counts.values, 
                            names=weather_counts.index,
                            title='Incidents by Weather Condition')
         st.plotly_chart(fig_weather)
 
-def save_quiz_score(score, total_questions):
+def save_quiz_score(score, total_questions, user=None):
+    """Append one quiz result to the quiz store and return it"""
     try:
-        # Load existing scores
-        try:
-            with open('quiz_scores.json', 'r') as f:
-                scores = json.load(f)
-        except FileNotFoundError:
-            scores = []
-        
-        # Add new score
-        scores.append({
-            'date': datetime.now().strftime("%Y-%m-%d %H:%M"),
-            'score': score,
-            'total': total_questions,
-            'percentage': (score/total_questions) * 100
-        })
-        
-        # Save updated scores
-        with open('quiz_scores.json', 'w') as f:
-            json.dump(scores, f)
-        
-        return scores
+        return get_quiz_store().add(score, total_questions, user=user)
     except Exception as e:
         st.error(f"Error saving score: {e}")
         return None
 
+ROAD_DATA_URL = "https://raw.githubusercontent.com/Reenamjot/boblol/main/detailed_analysis.csv"
+ROAD_DATA_TTL = 60 * 60
+
+@st.cache_data(ttl=ROAD_DATA_TTL)
+def load_road_table():
+    """Load road safety data from GitHub as a RoadTable
+
+    Goes through the local HTTP cache, which revalidates with ETags and
+    falls back to the bundled detailed_analysis.csv when offline. The
+    ragged AccidentPreventionMeasures fields are packed into CSR arrays.
+    """
+    return read_remote_csv(
+        ROAD_DATA_URL,
+        fallback_path="detailed_analysis.csv",
+        ttl=ROAD_DATA_TTL,
+        reader=read_road_csv
+    )
+
+@st.cache_resource(ttl=ROAD_DATA_TTL)
+def get_road_risk_index():
+    """Per-road risk statistics with precomputed rankings"""
+    return RoadRiskIndex.from_table(load_road_table())
+
+def road_speed_limits():
+    """RoadID -> posted speed limit for the live telemetry detectors"""
+    try:
+        return speed_limits_from_roads(load_road_table().frame)
+    except Exception as e:
+        print(f"Could not load road speed limits: {e}")
+        return None
+
 def load_road_data():
     """Load road safety data from GitHub"""
     try:
-        github_csv_url = "https://raw.githubusercontent.com/Reenamjot/boblol/main/detailed_analysis.csv"
-        road_data = pd.read_csv(github_csv_url)
-        
-        # Debug: Print column names
-        print("Available columns:", road_data.columns.tolist())
-        st.write("Available columns:", road_data.columns.tolist())
+        road_data = load_road_table().to_frame()
         
         # Clean column names - make them consistent
         road_data.columns = road_data.columns.str.strip().str.replace(' ', '_')
         
-        # Show cleaned column names
-        st.write("Cleaned column names:", road_data.columns.tolist())
-        
         return road_data
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
@@ -504,6 +541,30 @@ def main():
                     play_alert("sudden_brake")
                 if st.button("😴 Simulate Fatigue"):
                     play_alert("fatigue")
+
+            if st.button("🚗 Replay a Simulated Drive"):
+                samples = simulate_drive(duration=120, hz=10, seed=random.randint(0, 10_000))
+                events = VehicleDetector("demo").process(samples)
+                show_telematics_alerts(events)
+
+            # Live alerts from vehicles streaming to the telemetry service
+            st.markdown("### 📡 Live Vehicle Alerts")
+            if st.checkbox("Connect to live telemetry"):
+                try:
+                    service = get_telemetry_service(speed_limits=road_speed_limits())
+                except OSError as e:
+                    st.error(f"Could not start the telemetry service: {e}")
+                else:
+                    stats = service.stats()
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Connected Vehicles", stats["connections"])
+                    col2.metric("Samples Received", f"{stats['received']:,}")
+                    col3.metric("Queued", stats["queued"])
+                    events = service.drain_alerts(limit=20)
+                    if events:
+                        show_telematics_alerts(events)
+                    else:
+                        st.info(f"No new alerts. Vehicles can stream to {service.host}:{service.port}.")
             
             # Test Your Knowledge section after alerts
             st.markdown("### 📝 Test Your Knowledge")
@@ -529,7 +590,9 @@ def main():
                 
                 if st.button("Submit Quiz"):
                     st.write(f"Your score: {score}/{len(questions)}")
-                    save_quiz_score(score, len(questions))
+                    result = save_quiz_score(score, len(questions))
+                    if result is not None:
+                        render_quiz_standing(result)
 
         elif page == "Emergency Services":
             st.subheader("Emergency Services")
@@ -675,26 +738,31 @@ def main():
             
             # Text input for questions
             with chat_container:
-                user_question = st.text_input("Ask me anything about driving safety:", 
-                                            placeholder="e.g., How should I handle hydroplaning?")
-                if user_question:
+                # A form submits each question exactly once; reruns and the
+                # "New conversation" button don't resend what's in the box
+                with st.form("assistant_question", clear_on_submit=True):
+                    user_question = st.text_input("Ask me anything about driving safety:", 
+                                                placeholder="e.g., How should I handle hydroplaning?")
+                    asked = st.form_submit_button("Ask")
+                conversation = get_conversation()
+                if len(conversation) and st.button("🔄 New conversation"):
+                    conversation.clear()
+                for question, answer in list(conversation.turns):
+                    st.markdown(f"**You:** {question}")
+                    render_assistant_response(st.empty(), answer)
+                if asked and user_question.strip():
+                    st.markdown(f"**You:** {user_question}")
+                    # Message-like container, redrawn as each piece streams in
+                    response_box = st.empty()
+                    response = ""
                     with st.spinner("Thinking..."):
-                        response = ai_driving_assistant(user_question)
-                        
-                        # Create a message-like container for the response
-                        st.markdown(
-                            f"""
-                            <div style="
-                                background-color: #f0f2f6;
-                                border-radius: 10px;
-                                padding: 15px;
-                                margin: 10px 0;
-                            ">
-                                {response}
-                            </div>
-                            """,
-                            unsafe_allow_html=True
-                        )
+                        pieces = ai_driving_assistant_stream(user_question)
+                        first_piece = next(pieces, "")
+                    response += first_piece
+                    render_assistant_response(response_box, response)
+                    for piece in pieces:
+                        response += piece
+                        render_assistant_response(response_box, response)
 
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -798,30 +866,37 @@ def play_alert(alert_type):
     message = alert_messages.get(alert_type, f"⚠️ Alert: {alert_type}")
     st.warning(message)
 
+def show_telematics_alerts(events):
+    """Play the alerts raised by the telematics detectors, in time order"""
+    if not events:
+        st.success("✅ No unsafe driving detected.")
+        return
+    for event in events:
+        st.caption(f"t = {event['timestamp']:.1f}s")
+        play_alert(event['type'])
+
+def render_quiz_standing(result):
+    """Show how a quiz result compares with every driver's, from precomputed stats"""
+    try:
+        stats = get_quiz_store().stats()
+    except Exception as e:
+        st.error(f"Error loading quiz statistics: {e}")
+        return
+    st.write(f"You beat {stats.beaten_share(result['percentage']):.0f}% of drivers "
+             f"(average {stats.running.mean:.0f}%, median {stats.percentile(50):.0f}%)")
+    leaderboard = pd.DataFrame(stats.leaderboard.top())
+    if not leaderboard.empty:
+        st.markdown("#### 🏆 Leaderboard")
+        leaderboard['user'] = leaderboard['user'].fillna("Anonymous")
+        st.dataframe(leaderboard[['user', 'percentage', 'date']], hide_index=True)
+
 def save_report(report):
-    """Save voice report to a file"""
+    """Append a voice report to the report store"""
     try:
-        # Load existing reports
-        try:
-            with open('voice_reports.json', 'r') as f:
-                reports = json.load(f)
-        except FileNotFoundError:
-            reports = []
-        
-        # Add new report
-        reports.append({
-            'timestamp': report['timestamp'].strftime("%Y-%m-%d %H:%M:%S"),
-            'description': report['description'],
-            'location': report['location'],
-            'type': report['type']
-        })
-        
-        # Save updated reports
-        with open('voice_reports.json', 'w') as f:
-            json.dump(reports, f, indent=4)
-            
+        return get_report_store().add(report)
     except Exception as e:
         st.error(f"Error saving report: {str(e)}")
+        return None
 
 def emergency_mode():
     """Simplified emergency interface with large buttons and voice commands"""
@@ -875,32 +950,58 @@ def render_login():
             # Add account creation logic here
             st.success("Account created successfully!")
 
+def get_session_id():
+    """Stable id for the current browser session, used for fair queuing"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def get_conversation():
+    """The current session's assistant conversation history"""
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = Conversation()
+    return st.session_state.conversation
+
 def ai_driving_assistant(user_query):
     """
     AI assistant that answers driving-related questions using OpenAI's API
+
+    Repeat questions are answered from the response cache. Follow-up
+    questions see the earlier turns of this session's conversation.
     """
-    client = OpenAI()
-    system_prompt = """You are a helpful driving assistant. Provide clear, accurate advice about:
-    - Traffic rules and regulations
-    - Safe driving practices
-    - Vehicle maintenance
-    - Emergency situations
-    Always prioritize safety and include relevant disclaimers when necessary."""
-    
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_query}
-            ],
-            temperature=0.7,
-            max_tokens=300
-        )
-        return response.choices[0].message.content
+        return answer_question(user_query, session_id=get_session_id(),
+                               conversation=get_conversation())
     except Exception as e:
         return f"Error: {str(e)}"
 
+def ai_driving_assistant_stream(user_query):
+    """
+    Streaming version of ai_driving_assistant() that yields the answer in
+    pieces as the API produces them
+    """
+    try:
+        yield from stream_answer(user_query, session_id=get_session_id(),
+                                 conversation=get_conversation())
+    except Exception as e:
+        yield f"Error: {str(e)}"
+
+def render_assistant_response(placeholder, response):
+    """Draw the assistant's (possibly partial) answer into a placeholder"""
+    placeholder.markdown(
+        f"""
+        <div style="
+            background-color: #f0f2f6;
+            border-radius: 10px;
+            padding: 15px;
+            margin: 10px 0;
+        ">
+            {response}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
 def create_detailed_analysis():
     # Header with proper spacing
     st.markdown("""
@@ -992,6 +1093,25 @@ def create_detailed_analysis():
             </div>
         """, unsafe_allow_html=True)
     
+    # Road rankings from the precomputed risk index
+    st.markdown("### 🛣️ Most Dangerous Roads")
+    try:
+        road_index = get_road_risk_index()
+        metric = st.radio(
+            "Rank roads by",
+            ["accident_rate", "fatal_rate"],
+            format_func=lambda m: "Accidents per 10k daily vehicles" if m == "accident_rate" else "Fatal accidents per 10k daily vehicles",
+            horizontal=True
+        )
+        top_roads = road_index.top_n(5, by=metric)
+        st.dataframe(
+            top_roads[['RoadName', 'RoadType', 'SpeedLimit', 'AccidentCount', 'FatalAccidents', metric]],
+            hide_index=True,
+            use_container_width=True
+        )
+    except Exception as e:
+        st.error(f"Error loading road rankings: {str(e)}")
+    
     # Add recommendations section at the bottom
     st.markdown("""
         <div style='margin-top: 2rem; padding: 20px; background-color: #f0f7ff; border-radius: 10px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);'>
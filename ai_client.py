@@ -0,0 +1,77 @@
+import os
+import threading
+
+import httpx
+from openai import OpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Overridable through the environment or .env
+DEFAULT_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "30"))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+DEFAULT_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+_client = None
+_dispatch_client = None
+_client_lock = threading.Lock()
+
+
+def _timeout():
+    return httpx.Timeout(DEFAULT_TIMEOUT, connect=DEFAULT_CONNECT_TIMEOUT)
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+
+
+def get_openai_client():
+    """
+    Process-wide OpenAI client.
+
+    Every caller shares one keep-alive connection pool, so only the first
+    request pays for the TLS handshake. Failed requests are retried by the
+    SDK with exponential backoff up to OPENAI_MAX_RETRIES times.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                timeout=_timeout(),
+                max_retries=DEFAULT_MAX_RETRIES,
+                http_client=httpx.Client(timeout=_timeout(), limits=_limits())
+            )
+        return _client
+
+
+def get_dispatch_client():
+    """
+    The shared client with SDK retries turned off, for calls made through
+    the request engine. The engine retries them itself, so a 429 reaches
+    its process-wide cooldown instead of being retried per caller.
+    """
+    global _dispatch_client
+    client = get_openai_client()
+    with _client_lock:
+        if _dispatch_client is None:
+            _dispatch_client = client.with_options(max_retries=0)
+        return _dispatch_client
+
+
+def reset_openai_client():
+    """Close the shared client, e.g. after the API key changes"""
+    global _client, _dispatch_client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _dispatch_client = None
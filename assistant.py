@@ -0,0 +1,163 @@
+import queue
+
+from ai_client import get_dispatch_client
+from response_cache import get_response_cache, make_key
+from semantic_cache import get_semantic_cache
+from retrieval import build_context, estimate_tokens, get_retriever
+from request_engine import get_request_engine
+
+MODEL = "gpt-3.5-turbo"
+TEMPERATURE = 0.7
+MAX_TOKENS = 300
+
+SYSTEM_PROMPT = """You are a helpful driving assistant. Provide clear, accurate advice about:
+    - Traffic rules and regulations
+    - Safe driving practices
+    - Vehicle maintenance
+    - Emergency situations
+    Always prioritize safety and include relevant disclaimers when necessary."""
+
+
+def grounded_prompt(user_query):
+    """System prompt with the local facts most relevant to the question"""
+    try:
+        context = build_context(get_retriever(), user_query)
+    except Exception as e:
+        print(f"Retrieval failed, answering without local data: {e}")
+        context = ""
+    if not context:
+        return SYSTEM_PROMPT
+    return (
+        SYSTEM_PROMPT
+        + "\n\nLocal Santa Clara County data that may be relevant. Use it when it helps answer the question:\n"
+        + context
+    )
+
+
+def _prepare(user_query, model, temperature, conversation):
+    """
+    Build the chat messages plus the exact-cache key and semantic scope.
+
+    Follow-up questions depend on the conversation, so their key includes a
+    digest of the history and they skip the semantic cache (scope None).
+    """
+    system_prompt = grounded_prompt(user_query)
+    history = conversation.context_messages() if conversation else []
+    messages = [{"role": "system", "content": system_prompt}]
+    messages += history
+    messages.append({"role": "user", "content": user_query})
+
+    digest = conversation.digest() if history else ""
+    key = make_key(user_query, system_prompt + digest, model, temperature)
+    scope = None if history else make_key("", SYSTEM_PROMPT, model, temperature)
+    tokens = sum(estimate_tokens(m["content"]) for m in messages) + MAX_TOKENS
+    return messages, key, scope, tokens
+
+
+def _lookup(user_query, key, scope):
+    """Check the exact cache, then the semantic cache for a paraphrase"""
+    cache = get_response_cache()
+    answer = cache.get(key)
+    if answer is None and scope is not None:
+        answer, _ = get_semantic_cache().lookup(user_query, scope=scope)
+        if answer is not None:
+            cache.put(key, answer)
+    return answer
+
+
+def _store(user_query, answer, key, scope):
+    if answer:
+        get_response_cache().put(key, answer)
+        if scope is not None:
+            get_semantic_cache().add(user_query, answer, scope=scope)
+
+
+def _record(conversation, user_query, answer):
+    if conversation is not None and answer:
+        conversation.add_turn(user_query, answer)
+
+
+def answer_question(user_query, model=MODEL, temperature=TEMPERATURE, session_id=None, conversation=None):
+    """
+    Answer a driving question, serving exact repeats from the response
+    cache and close paraphrases from the semantic cache.
+
+    Misses go through the shared request engine, which rate-limits,
+    queues fairly per session_id and merges identical in-flight questions.
+    With a Conversation, earlier turns are sent within a token budget and
+    the new turn is recorded. API errors are raised and never cached.
+    """
+    messages, key, scope, tokens = _prepare(user_query, model, temperature, conversation)
+    answer = _lookup(user_query, key, scope)
+    if answer is not None:
+        _record(conversation, user_query, answer)
+        return answer
+
+    def call():
+        response = get_dispatch_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS
+        )
+        return response.choices[0].message.content
+
+    answer = get_request_engine().run(key, call, session_id=session_id, tokens=tokens)
+    _store(user_query, answer, key, scope)
+    _record(conversation, user_query, answer)
+    return answer
+
+
+def stream_answer(user_query, model=MODEL, temperature=TEMPERATURE, session_id=None, conversation=None):
+    """
+    Like answer_question(), but yield the answer as text pieces as soon as
+    the API produces them. A cached answer is yielded in one piece, as is
+    the answer to a question another session is already asking. The full
+    text is cached only if the stream runs to completion.
+    """
+    messages, key, scope, tokens = _prepare(user_query, model, temperature, conversation)
+    answer = _lookup(user_query, key, scope)
+    if answer is not None:
+        _record(conversation, user_query, answer)
+        yield answer
+        return
+
+    pieces = queue.Queue()
+
+    def call():
+        stream = get_dispatch_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS,
+            stream=True
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                pieces.put(delta)
+        return "".join(parts)
+
+    future, is_new = get_request_engine().submit(key, call, session_id=session_id, tokens=tokens)
+    if not is_new:
+        answer = future.result()
+        _record(conversation, user_query, answer)
+        yield answer
+        return
+
+    while True:
+        try:
+            yield pieces.get(timeout=0.05)
+        except queue.Empty:
+            if future.done():
+                break
+    while not pieces.empty():
+        yield pieces.get_nowait()
+
+    answer = future.result()
+    _store(user_query, answer, key, scope)
+    _record(conversation, user_query, answer)
@@ -0,0 +1,98 @@
+import re
+import hashlib
+from collections import deque
+
+from retrieval import estimate_tokens
+
+DEFAULT_CONTEXT_BUDGET = 800
+KEEP_RECENT_TURNS = 6
+SUMMARY_BUDGET = 250
+SUMMARY_LINE_CHARS = 160
+
+
+def first_sentence(text, limit=SUMMARY_LINE_CHARS):
+    """First sentence of an answer, trimmed to `limit` characters"""
+    text = re.sub(r"\s+", " ", text.strip())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    sentence = match.group(1) if match else text
+    if len(sentence) > limit:
+        sentence = sentence[:limit - 3].rstrip() + "..."
+    return sentence
+
+
+class Conversation:
+    """
+    Multi-turn history for one user session.
+
+    The most recent KEEP_RECENT_TURNS exchanges are kept verbatim as
+    (question, answer) tuples. Older exchanges are folded into a short
+    summary of one line each, and the oldest lines are dropped once the
+    summary exceeds SUMMARY_BUDGET tokens. Memory per session stays bounded
+    however long the conversation runs.
+    """
+
+    def __init__(self, keep_recent=KEEP_RECENT_TURNS, summary_budget=SUMMARY_BUDGET):
+        self.keep_recent = keep_recent
+        self.summary_budget = summary_budget
+        self.turns = deque()
+        self.summary = deque()
+        self._summary_tokens = 0
+
+    def __len__(self):
+        return len(self.turns) + len(self.summary)
+
+    def add_turn(self, question, answer):
+        self.turns.append((question, answer))
+        while len(self.turns) > self.keep_recent:
+            self._summarize(*self.turns.popleft())
+
+    def _summarize(self, question, answer):
+        line = f"Asked: {first_sentence(question)} Answered: {first_sentence(answer)}"
+        self.summary.append(line)
+        self._summary_tokens += estimate_tokens(line)
+        while self._summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self._summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def context_messages(self, token_budget=DEFAULT_CONTEXT_BUDGET):
+        """
+        Chat messages carrying the conversation so far, newest turns first
+        in priority, that fit within `token_budget` tokens.
+        """
+        messages = []
+        used = 0
+
+        if self.summary:
+            summary = "Summary of earlier conversation:\n" + "\n".join(self.summary)
+            cost = estimate_tokens(summary)
+            if cost <= token_budget:
+                messages.append({"role": "system", "content": summary})
+                used = cost
+
+        recent = []
+        for question, answer in reversed(self.turns):
+            cost = estimate_tokens(question) + estimate_tokens(answer)
+            if used + cost > token_budget:
+                break
+            recent.append((question, answer))
+            used += cost
+
+        for question, answer in reversed(recent):
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def digest(self):
+        """Short fingerprint of the history, used in cache keys"""
+        if not self:
+            return ""
+        h = hashlib.sha256()
+        for line in self.summary:
+            h.update(line.encode("utf-8") + b"\0")
+        for question, answer in self.turns:
+            h.update(question.encode("utf-8") + b"\0" + answer.encode("utf-8") + b"\0")
+        return h.hexdigest()[:16]
+
+    def clear(self):
+        self.turns.clear()
+        self.summary.clear()
+        self._summary_tokens = 0
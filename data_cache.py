@@ -0,0 +1,76 @@
+import os
+import glob
+
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+CACHE_DIR_NAME = ".drivesafe_cache"
+
+
+def cache_dir_for(csv_path):
+    """Return the cache directory that sits next to a data file"""
+    return os.path.join(os.path.dirname(os.path.abspath(csv_path)), CACHE_DIR_NAME)
+
+
+def source_signature(csv_path):
+    """Identify the current version of a file by its mtime and size"""
+    stat = os.stat(csv_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def cache_path_for(csv_path, reader_name="read_csv"):
+    """Build the Arrow cache file path for the current version of a CSV"""
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    name = f"{stem}.{reader_name}.{source_signature(csv_path)}.arrow"
+    return os.path.join(cache_dir_for(csv_path), name)
+
+
+def _remove_stale_entries(csv_path, reader_name, keep_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    pattern = os.path.join(cache_dir_for(csv_path), f"{stem}.{reader_name}.*.arrow")
+    for path in glob.glob(pattern):
+        if path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_csv_cached(csv_path, reader=pd.read_csv):
+    """
+    Read a CSV through a columnar Arrow cache.
+
+    The first read of each version of the file parses the CSV with `reader`
+    and writes an uncompressed Arrow (Feather v2) copy next to it. Later reads
+    memory-map that copy instead of parsing. The cache is keyed on the CSV's
+    mtime and size, so editing or appending to the CSV rebuilds it.
+    """
+    if feather is None:
+        return reader(csv_path)
+
+    reader_name = getattr(reader, "__name__", "reader")
+    path = cache_path_for(csv_path, reader_name)
+
+    if os.path.exists(path):
+        try:
+            return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+        except Exception:
+            # A truncated or unreadable cache file is rebuilt below
+            pass
+
+    df = reader(csv_path)
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+        _remove_stale_entries(csv_path, reader_name, path)
+    except Exception as e:
+        print(f"Could not write columnar cache for {csv_path}: {e}")
+
+    return df
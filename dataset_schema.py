@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Declared layout of synthetic_traffic_fatalities.csv and
+# teen_driving_synthetic_data.csv. Both files share the same columns.
+
+DAYS_OF_WEEK = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+TIMES_OF_DAY = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+BOOL_COLUMNS = ['Speeding', 'SeatbeltUsed', 'Fatality']
+# Lower-cased spellings of a true Yes/No cell; anything else reads as False
+TRUE_VALUES = {'yes', 'y', 'true', '1', '1.0'}
+
+INCIDENT_DTYPES = {
+    'IncidentID': 'str',
+    # Age and the Yes/No columns are parsed loosely and coerced afterwards
+    # (see _coerce), so one blank or mistyped cell can't fail the whole file
+    'Age': 'str',
+    'TimeOfDay': pd.CategoricalDtype(TIMES_OF_DAY, ordered=True),
+    'DayOfWeek': pd.CategoricalDtype(DAYS_OF_WEEK, ordered=True),
+    # Open vocabularies: the two files use different distraction labels
+    'WeatherCondition': 'category',
+    'Distraction': 'category',
+    'Speeding': 'category',
+    'SeatbeltUsed': 'category',
+    'Fatality': 'category',
+}
+
+INCIDENT_FILES = ['synthetic_traffic_fatalities.csv', 'teen_driving_synthetic_data.csv']
+
+
+def _flags(series):
+    """
+    Yes/No categorical -> bool, ignoring case. Anything not in TRUE_VALUES,
+    including blanks and unknown labels, counts as False (e.g. not fatal).
+    """
+    labels = series.cat.categories.astype(str).str.strip().str.lower()
+    # Code -1 (missing) picks the trailing False
+    truth = np.append(labels.isin(TRUE_VALUES), False)
+    return pd.Series(truth[series.cat.codes.to_numpy()], index=series.index, name=series.name)
+
+
+def _coerce(frame):
+    for col in BOOL_COLUMNS:
+        if col in frame and isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = _flags(frame[col])
+    if 'Age' in frame and not pd.api.types.is_numeric_dtype(frame['Age']):
+        ages = pd.to_numeric(frame['Age'], errors='coerce')
+        frame['Age'] = ages.where(ages.between(0, 127)).astype('Int8')
+    return frame
+
+
+class _CoercedChunks:
+    """Chunked reader that coerces each chunk, usable like pandas' TextFileReader"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.chunks.close()
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            yield _coerce(chunk)
+
+    def close(self):
+        self.chunks.close()
+
+
+def read_incidents(path, **kwargs):
+    """
+    Read an incident CSV with compact dtypes.
+
+    Yes/No columns become bool, with blank or unrecognised cells read as
+    False. Low-cardinality text columns become categoricals and Age becomes
+    nullable Int8, missing where it isn't a plausible number. "None" is kept
+    as a Distraction label rather than treated as missing. Extra keyword
+    arguments (chunksize, usecols, ...) are passed through to pd.read_csv.
+    """
+    usecols = kwargs.get('usecols')
+    dtypes = INCIDENT_DTYPES
+    if usecols is not None:
+        dtypes = {col: dtype for col, dtype in INCIDENT_DTYPES.items() if col in usecols}
+
+    result = pd.read_csv(
+        path,
+        dtype=dtypes,
+        keep_default_na=False,
+        na_values=[''],
+        **kwargs
+    )
+    if kwargs.get('chunksize') is not None or kwargs.get('iterator'):
+        return _CoercedChunks(result)
+    return _coerce(result)
+
+
+def concat_incidents(frames):
+    """
+    Concatenate incident frames without losing categorical dtypes.
+
+    pd.concat falls back to object columns when open-vocabulary categoricals
+    have different categories, so those columns are unioned first.
+    """
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 1:
+        return frames[0]
+
+    combined = pd.concat(frames)
+    for col in combined.columns:
+        parts = [frame[col] for frame in frames if col in frame]
+        if len(parts) == len(frames) and all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            if combined[col].dtype != parts[0].dtype:
+                merged = union_categoricals([p.array for p in parts], ignore_order=True)
+                combined[col] = pd.Series(merged, index=combined.index)
+    return combined
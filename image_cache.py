@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+from data_cache import CACHE_DIR_NAME
+from sqlite_store import SQLiteStore
+
+DEFAULT_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_MB", "500")) * 1024 * 1024
+INDEX_NAME = "index.sqlite3"
+LEGACY_MANIFEST = "manifest.json"
+
+
+def image_key(prompt, model, size, n):
+    """Cache key for one image generation request"""
+    payload = json.dumps([prompt.strip(), model, size, int(n)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class ImageCache(SQLiteStore):
+    """
+    Content-addressed store of generated images.
+
+    Each image is saved once under objects/<sha256 of its bytes>.png, so
+    identical images returned for different requests share one file. A
+    SQLite index (see SQLiteStore) maps a request key (see image_key) to its
+    object digests and when it was last used, and counts the references to
+    each object. Changes run in one write transaction, so several app
+    workers can share the directory, and a cache hit only updates its own
+    row. When the objects exceed `max_bytes`, the least recently used
+    requests are dropped, along with any objects that no remaining request
+    refers to. Entries from the old manifest.json are imported the first
+    time.
+    """
+
+    LEGACY_JSON = LEGACY_MANIFEST
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries ("
+        " key TEXT PRIMARY KEY,"
+        " objects TEXT NOT NULL,"
+        " info TEXT,"
+        " created REAL NOT NULL,"
+        " last_used REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)",
+        "CREATE TABLE IF NOT EXISTS objects ("
+        " digest TEXT PRIMARY KEY,"
+        " bytes INTEGER NOT NULL,"
+        " refs INTEGER NOT NULL)",
+    )
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or os.path.join(os.getcwd(), CACHE_DIR_NAME, "images")
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        super().__init__(os.path.join(self.root, INDEX_NAME))
+
+    def _legacy_records(self, legacy):
+        # The JSON manifest was {"entries": {key: entry}, "objects": {...}}
+        entries = legacy.get("entries", {}) if isinstance(legacy, dict) else {}
+        return list(entries.items())
+
+    def _import_item(self, item):
+        key, entry = item
+        digests = entry.get("objects", [])
+        if not all(os.path.exists(self.object_path(digest)) for digest in digests):
+            return
+        info = {name: value for name, value in entry.items() if name not in ("objects", "created", "last_used")}
+        self._add_entry(key, digests, info, entry.get("created", 0.0), entry.get("last_used", 0.0))
+
+    def _write(self):
+        """Take SQLite's write lock up front, so no other process changes the index under us"""
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest + ".png")
+
+    def temp_path(self, name):
+        """A path to download into before put() moves it into the store"""
+        return os.path.join(self.tmp_dir, f"{os.getpid()}.{threading.get_ident()}.{name}")
+
+    def get(self, key):
+        """Return the image paths stored for `key`, or None"""
+        with self._lock:
+            row = self._db.execute("SELECT objects FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            paths = [self.object_path(digest) for digest in json.loads(row[0])]
+            with self._db:
+                if not all(os.path.exists(path) for path in paths):
+                    self._write()
+                    self._remove_entry(key)
+                    self.misses += 1
+                    return None
+                self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return paths
+
+    def put(self, key, files, **info):
+        """
+        Move downloaded `files` into the store under `key` and return their
+        stored paths. Extra keyword arguments (prompt, model, ...) are kept
+        in the index for reference.
+        """
+        with self._lock, self._db:
+            self._write()
+            self._remove_entry(key)
+            digests = []
+            for path in files:
+                digest = file_digest(path)
+                target = self.object_path(digest)
+                known = self._db.execute("SELECT 1 FROM objects WHERE digest = ?", (digest,)).fetchone()
+                if known and os.path.exists(target):
+                    os.remove(path)
+                else:
+                    os.replace(path, target)
+                digests.append(digest)
+
+            now = time.time()
+            self._add_entry(key, digests, info, now, now)
+            self._evict(keep=key)
+            return [self.object_path(digest) for digest in digests]
+
+    def _add_entry(self, key, digests, info, created, last_used):
+        self._db.execute(
+            "INSERT INTO entries (key, objects, info, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(digests), json.dumps(info), created, last_used)
+        )
+        for digest in digests:
+            self._db.execute(
+                "INSERT INTO objects (digest, bytes, refs) VALUES (?, ?, 1)"
+                " ON CONFLICT (digest) DO UPDATE SET refs = refs + 1",
+                (digest, os.path.getsize(self.object_path(digest)))
+            )
+
+    def _remove_entry(self, key):
+        row = self._db.execute("SELECT objects FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        for digest in json.loads(row[0]):
+            self._db.execute("UPDATE objects SET refs = refs - 1 WHERE digest = ?", (digest,))
+            refs = self._db.execute("SELECT refs FROM objects WHERE digest = ?", (digest,)).fetchone()
+            if refs is not None and refs[0] <= 0:
+                self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+                path = self.object_path(digest)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _total_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM objects").fetchone()[0]
+
+    def total_bytes(self):
+        with self._lock:
+            return self._total_bytes()
+
+    def _evict(self, keep=None):
+        while self._total_bytes() > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key FROM entries WHERE key != ? ORDER BY last_used LIMIT 1", (keep,)
+            ).fetchone()
+            if row is None:
+                break
+            self._remove_entry(row[0])
+
+    def clear(self):
+        with self._lock, self._db:
+            self._write()
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM objects")
+            shutil.rmtree(self.objects_dir, ignore_errors=True)
+            os.makedirs(self.objects_dir, exist_ok=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+                "objects": self._db.execute("SELECT COUNT(*) FROM objects").fetchone()[0],
+                "bytes": self._total_bytes(),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache():
+    """Process-wide ImageCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
@@ -0,0 +1,171 @@
+import os
+import json
+
+import pandas as pd
+
+from data_cache import cache_dir_for, feather
+from dataset_schema import DAYS_OF_WEEK, TIMES_OF_DAY
+from incident_stream import IncidentSummary, fatality_flags
+
+AGE_BINS = [0, 16, 18, 20, 25, 200]
+AGE_BANDS = ['Under 16', '16-17', '18-19', '20-24', '25+']
+
+CUBE_DIMENSIONS = [
+    'TimeOfDay', 'DayOfWeek', 'WeatherCondition', 'Distraction',
+    'Speeding', 'SeatbeltUsed', 'AgeBand'
+]
+
+DIMENSION_ORDER = {
+    'TimeOfDay': TIMES_OF_DAY,
+    'DayOfWeek': DAYS_OF_WEEK,
+    'AgeBand': AGE_BANDS,
+}
+
+MEASURES = ['count', 'fatal']
+
+# Bump when the way rows are bucketed or flagged changes, so cubes saved by
+# older code are rebuilt instead of reused
+CUBE_FORMAT_VERSION = 2
+
+
+def _layout():
+    """What a saved cube must match to be reused"""
+    return {
+        'version': CUBE_FORMAT_VERSION,
+        'dimensions': CUBE_DIMENSIONS,
+        'age_bins': AGE_BINS,
+        'age_bands': AGE_BANDS,
+    }
+
+
+def age_bands(ages):
+    """Bucket ages into the cube's age bands"""
+    bands = pd.cut(pd.to_numeric(ages, errors='coerce'), bins=AGE_BINS, right=False, labels=AGE_BANDS)
+    return bands.cat.add_categories(['Unknown']).fillna('Unknown').astype(str)
+
+
+def _dimension_frame(df):
+    """Pull the cube dimensions out of an incident frame as plain columns"""
+    dims = {}
+    for dim in CUBE_DIMENSIONS:
+        if dim == 'AgeBand':
+            dims[dim] = age_bands(df['Age']) if 'Age' in df else 'Unknown'
+        elif dim in df:
+            dims[dim] = df[dim].astype(str) if not pd.api.types.is_bool_dtype(df[dim]) else df[dim]
+        else:
+            dims[dim] = 'Unknown'
+    return pd.DataFrame(dims, index=df.index)
+
+
+class IncidentCube:
+    """
+    Incident and fatality counts pre-aggregated over every combination of
+    CUBE_DIMENSIONS that occurs in the data.
+
+    Breakdowns and filters are answered by summing cells, so their cost
+    depends on the number of cells, not the number of incidents.
+    """
+
+    def __init__(self, cells=None, rows=0, source=None):
+        if cells is None:
+            cells = pd.DataFrame(columns=CUBE_DIMENSIONS + MEASURES)
+        self.cells = cells
+        self.rows = rows
+        self.source = source
+
+    @classmethod
+    def from_frame(cls, df):
+        cube = cls()
+        cube.update(df)
+        return cube
+
+    def update(self, df):
+        """Add new incident rows to the cube without touching existing rows"""
+        if len(df) == 0:
+            return self
+
+        chunk = _dimension_frame(df)
+        chunk['count'] = 1
+        chunk['fatal'] = fatality_flags(df['Fatality']).values
+        new_cells = chunk.groupby(CUBE_DIMENSIONS, sort=False)[MEASURES].sum().reset_index()
+
+        if len(self.cells):
+            new_cells = pd.concat([self.cells, new_cells], ignore_index=True)
+            new_cells = new_cells.groupby(CUBE_DIMENSIONS, sort=False)[MEASURES].sum().reset_index()
+
+        self.cells = new_cells.astype({'count': 'int64', 'fatal': 'int64'})
+        self.rows += len(df)
+        return self
+
+    def _select(self, filters):
+        cells = self.cells
+        for dim, value in filters.items():
+            if dim not in CUBE_DIMENSIONS:
+                raise KeyError(f"Unknown cube dimension: {dim}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells[dim].isin(values)]
+        return cells
+
+    def breakdown(self, by, **filters):
+        """
+        Counts, fatal counts and fatality rate grouped by one or more
+        dimensions, e.g. cube.breakdown('DayOfWeek', WeatherCondition='Rainy').
+        """
+        cells = self._select(filters)
+        result = cells.groupby(by, sort=True)[MEASURES].sum()
+
+        if isinstance(by, str) and by in DIMENSION_ORDER:
+            order = [v for v in DIMENSION_ORDER[by] if v in result.index]
+            order += [v for v in result.index if v not in order]
+            result = result.reindex(order)
+
+        result['fatality_rate'] = (result['fatal'] / result['count'] * 100).fillna(0)
+        return result
+
+    def totals(self, **filters):
+        """Total and fatal incident counts for a filter combination"""
+        cells = self._select(filters)
+        return int(cells['count'].sum()), int(cells['fatal'].sum())
+
+    def summary(self, **filters):
+        """Build an IncidentSummary for the dashboard from cube cells"""
+        summary = IncidentSummary()
+        summary.total, summary.fatal = self.totals(**filters)
+        by_day = self.breakdown('DayOfWeek', **filters)
+        by_weather = self.breakdown('WeatherCondition', **filters)
+        summary.day_counts = by_day['count']
+        summary.day_fatal = by_day['fatal']
+        summary.weather_counts = by_weather['count']
+        summary.weather_fatal = by_weather['fatal']
+        return summary
+
+    def save(self, path):
+        """Write the cells as Arrow and the bookkeeping as JSON next to it"""
+        if feather is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        feather.write_feather(self.cells.reset_index(drop=True), tmp_path)
+        os.replace(tmp_path, path)
+        with open(path + '.json', 'w') as f:
+            json.dump({'rows': self.rows, 'source': self.source, 'layout': _layout()}, f)
+
+    @classmethod
+    def load(cls, path):
+        """The saved cube, or None if missing, unreadable or from another layout"""
+        if feather is None or not os.path.exists(path + '.json'):
+            return None
+        try:
+            with open(path + '.json', 'r') as f:
+                meta = json.load(f)
+            if meta.get('layout') != _layout():
+                return None
+            cells = feather.read_table(path).to_pandas()
+        except Exception:
+            return None
+        return cls(cells, rows=meta.get('rows', 0), source=meta.get('source'))
+
+
+def cube_path_for(csv_path):
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(cache_dir_for(csv_path), f"{stem}.cube.arrow")
@@ -0,0 +1,160 @@
+import io
+import os
+import threading
+
+from data_cache import read_csv_cached, source_signature
+from dataset_schema import read_incidents, concat_incidents
+from incident_cube import IncidentCube, cube_path_for
+
+TAIL_PROBE_BYTES = 4096
+
+
+class Watermark:
+    """How far into an append-only CSV the loader has already ingested"""
+
+    def __init__(self, offset, rows, header, last_line, signature=None):
+        self.offset = offset
+        self.rows = rows
+        self.header = header
+        self.last_line = last_line
+        # source_signature() of the file when it was last looked at
+        self.signature = signature
+
+    def still_valid(self, f, size):
+        """
+        True if the file still starts with the ingested bytes, checked
+        cheaply by re-reading the header and the last ingested line.
+        """
+        if size < self.offset:
+            return False
+        f.seek(0)
+        if f.read(len(self.header)) != self.header:
+            return False
+        f.seek(self.offset - len(self.last_line))
+        return f.read(len(self.last_line)) == self.last_line
+
+
+def _last_line(f, end):
+    """Return the bytes of the complete line that finishes at `end`"""
+    start = max(0, end - TAIL_PROBE_BYTES)
+    f.seek(start)
+    data = f.read(end - start)
+    cut = data.rfind(b'\n', 0, len(data) - 1)
+    return data[cut + 1:]
+
+
+class IncrementalIncidentLoader:
+    """
+    Keep an incident frame and its IncidentCube in sync with a CSV that only
+    grows at the end.
+
+    refresh() compares the file's mtime and size with the watermark and,
+    when it has grown, parses only the bytes after the watermark. A file
+    that shrank, was rewritten, or changed without growing is reloaded in
+    full. On a cold start the persisted cube is reused if it was saved for
+    this version of the file. `enrich` is applied to each newly parsed block
+    of rows (for example to attach weather columns) before it is merged into
+    the frame.
+    """
+
+    def __init__(self, csv_path, reader=read_incidents, enrich=None):
+        self.csv_path = csv_path
+        self.reader = reader
+        self.enrich = enrich
+        self.frame = None
+        self.cube = None
+        self.watermark = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Bring the frame and cube up to date and return the frame"""
+        with self._lock:
+            signature = source_signature(self.csv_path)
+            if self.watermark is None:
+                self._full_load()
+            elif signature != self.watermark.signature:
+                size = os.path.getsize(self.csv_path)
+                with open(self.csv_path, 'rb') as f:
+                    grew = size > self.watermark.offset
+                    if grew and self.watermark.still_valid(f, size):
+                        self._load_delta(f, size, signature)
+                    else:
+                        self._full_load()
+            return self.frame
+
+    def _full_load(self):
+        with open(self.csv_path, 'rb') as f:
+            signature = source_signature(self.csv_path)
+            size = os.fstat(f.fileno()).st_size
+            f.seek(max(0, size - 1))
+            ends_cleanly = f.read(1) == b'\n'
+
+            if ends_cleanly:
+                # Cold start goes through the columnar cache
+                frame = read_csv_cached(self.csv_path, reader=self.reader)
+                if source_signature(self.csv_path) != signature:
+                    ends_cleanly = False
+
+            if not ends_cleanly:
+                # Only parse up to the last complete line
+                f.seek(0)
+                data = f.read()
+                size = data.rfind(b'\n') + 1
+                frame = self.reader(io.BytesIO(data[:size]))
+
+            f.seek(0)
+            header = f.readline()
+            last_line = _last_line(f, size) if size > len(header) else header
+
+        frame = self._prepare(frame, start=0)
+        self.frame = frame
+        self.watermark = Watermark(size, len(frame), header, last_line, signature)
+
+        cube = IncidentCube.load(cube_path_for(self.csv_path)) if ends_cleanly else None
+        if cube is not None and cube.source == signature and cube.rows == len(frame):
+            self.cube = cube
+        else:
+            self.cube = IncidentCube.from_frame(frame)
+            self._save_cube()
+
+    def _load_delta(self, f, size, signature):
+        f.seek(self.watermark.offset)
+        data = f.read(size - self.watermark.offset)
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            # Only a partial line has been written so far
+            self.watermark.signature = signature
+            return
+
+        delta = self.reader(io.BytesIO(self.watermark.header + data[:end]))
+        delta = self._prepare(delta, start=self.watermark.rows)
+
+        self.frame = concat_incidents([self.frame, delta])
+        self.cube.update(delta)
+        offset = self.watermark.offset + end
+        self.watermark = Watermark(
+            offset,
+            self.watermark.rows + len(delta),
+            self.watermark.header,
+            _last_line(f, offset),
+            signature
+        )
+        self._save_cube()
+
+    def _prepare(self, frame, start):
+        frame.index = range(start, start + len(frame))
+        if self.enrich is not None:
+            frame = self.enrich(frame)
+        return frame
+
+    def _save_cube(self):
+        # Only claim to match the file if no partial line follows the watermark
+        if os.path.getsize(self.csv_path) == self.watermark.offset:
+            self.cube.source = source_signature(self.csv_path)
+        else:
+            self.cube.source = None
+        self.cube.rows = self.watermark.rows
+        try:
+            self.cube.save(cube_path_for(self.csv_path))
+        except Exception as e:
+            print(f"Could not save incident cube for {self.csv_path}: {e}")
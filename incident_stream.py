@@ -0,0 +1,98 @@
+import pandas as pd
+
+from dataset_schema import TRUE_VALUES
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def fatality_flags(series):
+    """Turn a Fatality column holding Yes/No, True/False or 1/0 into 0/1 ints"""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        return pd.to_numeric(series, errors="coerce").fillna(0).astype("int64").clip(0, 1)
+    return series.astype(str).str.strip().str.lower().isin(TRUE_VALUES).astype("int64")
+
+
+class IncidentSummary:
+    """Running totals for the dashboard breakdowns, built one chunk at a time"""
+
+    def __init__(self):
+        self.total = 0
+        self.fatal = 0
+        self.day_counts = pd.Series(dtype="int64")
+        self.day_fatal = pd.Series(dtype="int64")
+        self.weather_counts = pd.Series(dtype="int64")
+        self.weather_fatal = pd.Series(dtype="int64")
+
+    @classmethod
+    def from_frame(cls, df):
+        summary = cls()
+        summary.update(df)
+        return summary
+
+    def update(self, chunk):
+        """Fold one chunk of incident rows into the totals"""
+        if len(chunk) == 0:
+            return self
+
+        fatal = fatality_flags(chunk["Fatality"])
+        self.total += len(chunk)
+        self.fatal += int(fatal.sum())
+
+        if "DayOfWeek" in chunk:
+            self.day_counts, self.day_fatal = self._fold(
+                self.day_counts, self.day_fatal, chunk["DayOfWeek"], fatal)
+        if "WeatherCondition" in chunk:
+            self.weather_counts, self.weather_fatal = self._fold(
+                self.weather_counts, self.weather_fatal, chunk["WeatherCondition"], fatal)
+        return self
+
+    def merge(self, other):
+        """Combine totals from another summary, e.g. one built on another worker"""
+        self.total += other.total
+        self.fatal += other.fatal
+        self.day_counts = self.day_counts.add(other.day_counts, fill_value=0).astype("int64")
+        self.day_fatal = self.day_fatal.add(other.day_fatal, fill_value=0).astype("int64")
+        self.weather_counts = self.weather_counts.add(other.weather_counts, fill_value=0).astype("int64")
+        self.weather_fatal = self.weather_fatal.add(other.weather_fatal, fill_value=0).astype("int64")
+        return self
+
+    @staticmethod
+    def _fold(counts, fatal_counts, keys, fatal):
+        grouped = fatal.groupby(keys, observed=True, sort=False).agg(["size", "sum"])
+        grouped.index = grouped.index.astype(str)
+        counts = counts.add(grouped["size"], fill_value=0).astype("int64")
+        fatal_counts = fatal_counts.add(grouped["sum"], fill_value=0).astype("int64")
+        return counts, fatal_counts
+
+    @property
+    def fatality_rate(self):
+        """Share of incidents that were fatal, as a percentage"""
+        if self.total == 0:
+            return 0.0
+        return self.fatal / self.total * 100
+
+    def day_fatality_rates(self):
+        return (self.day_fatal / self.day_counts * 100).fillna(0)
+
+    def weather_fatality_rates(self):
+        return (self.weather_fatal / self.weather_counts * 100).fillna(0)
+
+
+def iter_incident_chunks(csv_path, chunksize=DEFAULT_CHUNK_SIZE, reader=pd.read_csv, **kwargs):
+    """Yield the incident CSV as DataFrames of at most `chunksize` rows"""
+    with reader(csv_path, chunksize=chunksize, **kwargs) as chunks:
+        for chunk in chunks:
+            yield chunk
+
+
+def stream_incident_summary(csv_path, chunksize=DEFAULT_CHUNK_SIZE, reader=pd.read_csv, **kwargs):
+    """
+    Build an IncidentSummary for a CSV of any size.
+
+    Only one chunk is held in memory at a time, so peak memory depends on
+    `chunksize` and not on the length of the file.
+    """
+    summary = IncidentSummary()
+    for chunk in iter_incident_chunks(csv_path, chunksize=chunksize, reader=reader, **kwargs):
+        summary.update(chunk)
+    return summary
@@ -0,0 +1,161 @@
+"""
+Drive the AI Assistant (or image generation) path with N concurrent users
+and report latency percentiles and throughput.
+
+    python load_test.py --users 50 --requests 10 --profile typical --stream
+
+Without --base-url a mock server (mock_llm_server.py) is started in-process.
+Caches are written to a temporary directory so runs don't warm each other.
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+import threading
+
+QUESTIONS = [
+    "How should I handle hydroplaning?",
+    "What is a safe following distance on the freeway?",
+    "How do I merge onto a busy expressway?",
+    "What should I do after a minor accident?",
+    "How often should I check my tyre pressure?",
+    "Is it safe to drive in heavy fog?",
+    "How do I recover from a skid on ice?",
+    "What is the right way to use a roundabout?",
+]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []
+        self.first_token = []
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency, first_token=None, error=False):
+        with self.lock:
+            if error:
+                self.errors += 1
+            else:
+                self.latencies.append(latency)
+                if first_token is not None:
+                    self.first_token.append(first_token)
+
+
+def _question(user, i, repeat):
+    question = QUESTIONS[(user + i) % len(QUESTIONS)]
+    # A random token keeps paraphrase matching from answering unique questions
+    return question if repeat else f"{question} [{uuid.uuid4().hex}]"
+
+
+def _assistant_user(user, args, results):
+    import assistant
+
+    for i in range(args.requests):
+        question = _question(user, i, args.repeat_questions)
+        start = time.perf_counter()
+        first = None
+        try:
+            if args.stream:
+                for _ in assistant.stream_answer(question, session_id=f"user-{user}"):
+                    if first is None:
+                        first = time.perf_counter() - start
+            else:
+                assistant.answer_question(question, session_id=f"user-{user}")
+        except Exception as e:
+            if args.verbose:
+                print(f"user {user}: {e}")
+            results.record(0, error=True)
+            continue
+        results.record(time.perf_counter() - start, first)
+
+
+def _image_user(user, args, results):
+    import App_Pic
+
+    for i in range(args.requests):
+        start = time.perf_counter()
+        try:
+            App_Pic.get_image(_question(user, i, args.repeat_questions))
+        except Exception as e:
+            if args.verbose:
+                print(f"user {user}: {e}")
+            results.record(0, error=True)
+            continue
+        results.record(time.perf_counter() - start)
+
+
+def report(results, elapsed, label):
+    done = len(results.latencies)
+    print(f"\n{label}")
+    print(f"  completed   {done}   errors {results.errors}   wall {elapsed:.2f}s")
+    print(f"  throughput  {done / elapsed:.1f} req/s" if elapsed else "  throughput  n/a")
+    for pct in (50, 95, 99):
+        print(f"  p{pct:<3}       {percentile(results.latencies, pct) * 1000:.0f} ms")
+    if results.first_token:
+        print("  time to first token")
+        for pct in (50, 95, 99):
+            print(f"    p{pct:<3}     {percentile(results.first_token, pct) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the DriveSafe assistant path")
+    parser.add_argument("--users", type=int, default=10, help="concurrent users")
+    parser.add_argument("--requests", type=int, default=5, help="requests per user")
+    parser.add_argument("--stream", action="store_true", help="use streamed completions")
+    parser.add_argument("--images", action="store_true", help="drive App_Pic.get_image instead")
+    parser.add_argument("--repeat-questions", action="store_true",
+                        help="reuse a small question set so caches can hit")
+    parser.add_argument("--base-url", help="existing OpenAI-compatible server to target")
+    parser.add_argument("--profile", default="typical", help="mock server profile")
+    parser.add_argument("--error-rate", type=float, help="override the profile's error rate")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, repo_dir)
+
+    server = None
+    if args.base_url is None:
+        from mock_llm_server import start_mock_server
+        server = start_mock_server(profile=args.profile, error_rate=args.error_rate)
+        host, port = server.server_address[:2]
+        args.base_url = f"http://{host}:{port}/v1"
+
+    # Must be set before ai_client builds the shared client
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ.setdefault("OPENAI_API_KEY", "load-test")
+    os.chdir(tempfile.mkdtemp(prefix="drivesafe-load-"))
+
+    worker = _image_user if args.images else _assistant_user
+    results = Results()
+    threads = [threading.Thread(target=worker, args=(user, args, results)) for user in range(args.users)]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    label = "App_Pic.get_image" if args.images else ("stream_answer" if args.stream else "answer_question")
+    report(results, elapsed, f"{label}: {args.users} users x {args.requests} requests against {args.base_url}")
+    if server is not None:
+        print(f"  server saw {server.state.requests} requests, injected {server.state.errors} errors")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
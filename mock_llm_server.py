@@ -0,0 +1,248 @@
+"""
+Local stand-in for the OpenAI chat-completions and images endpoints, for
+load testing without touching the real API.
+
+    python mock_llm_server.py --port 8600 --profile typical
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8600/v1 and any
+OPENAI_API_KEY.
+"""
+import json
+import time
+import uuid
+import random
+import struct
+import zlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Latencies are in milliseconds
+PROFILES = {
+    "instant": {"first_token_ms": 0, "token_ms": 0, "jitter": 0.0, "error_rate": 0.0},
+    "fast": {"first_token_ms": 150, "token_ms": 10, "jitter": 0.2, "error_rate": 0.0},
+    "typical": {"first_token_ms": 400, "token_ms": 25, "jitter": 0.3, "error_rate": 0.0},
+    "slow": {"first_token_ms": 1500, "token_ms": 60, "jitter": 0.5, "error_rate": 0.0},
+    "flaky": {"first_token_ms": 400, "token_ms": 25, "jitter": 0.3, "error_rate": 0.1},
+    "rate_limited": {"first_token_ms": 400, "token_ms": 25, "jitter": 0.3, "error_rate": 0.3,
+                     "error_statuses": [429]},
+}
+DEFAULT_ERROR_STATUSES = [429, 500, 503]
+
+ANSWER = (
+    "Slow down and keep both hands on the wheel. Avoid sudden braking or sharp "
+    "steering, ease off the accelerator until the tyres regain grip, and leave "
+    "extra following distance. Call 911 if anyone is hurt."
+)
+
+
+def _tiny_png():
+    """A valid 1x1 grey PNG"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\x80")
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", pixels) + chunk(b"IEND", b"")
+
+
+PNG = _tiny_png()
+
+
+class MockState:
+    def __init__(self, profile, seed=None):
+        self.profile = dict(profile)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def delay(self, ms):
+        if ms <= 0:
+            return
+        jitter = self.profile.get("jitter", 0.0)
+        with self.lock:
+            factor = 1 + self.random.uniform(-jitter, jitter)
+        time.sleep(ms * factor / 1000.0)
+
+    def pick_error(self):
+        with self.lock:
+            self.requests += 1
+            if self.random.random() >= self.profile.get("error_rate", 0.0):
+                return None
+            self.errors += 1
+            return self.random.choice(self.profile.get("error_statuses", DEFAULT_ERROR_STATUSES))
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _maybe_fail(self):
+        status = self.state.pick_error()
+        if status is None:
+            return False
+        headers = {"Retry-After": "1"} if status == 429 else {}
+        error_type = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(status, {"error": {"message": f"Injected {status}", "type": error_type}}, headers)
+        return True
+
+    def do_GET(self):
+        if self.path.startswith("/images/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(PNG)))
+            self.end_headers()
+            self.wfile.write(PNG)
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        if self.path.endswith("/chat/completions"):
+            self._chat(self._read_json())
+        elif self.path.endswith("/images/generations"):
+            self._images(self._read_json())
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def _chat(self, request):
+        if self._maybe_fail():
+            return
+
+        words = ANSWER.split(" ")
+        max_tokens = request.get("max_tokens") or len(words)
+        words = words[:max_tokens]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = request.get("model", "gpt-3.5-turbo")
+
+        self.state.delay(self.state.profile["first_token_ms"])
+
+        if not request.get("stream"):
+            self.state.delay(self.state.profile["token_ms"] * len(words))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(words), "total_tokens": len(words)},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        for i, word in enumerate(words):
+            if i:
+                self.state.delay(self.state.profile["token_ms"])
+            self._send_event({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": None,
+                }],
+            })
+        self._send_event({
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        })
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _send_event(self, payload):
+        self.wfile.write(b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n")
+        self.wfile.flush()
+
+    def _images(self, request):
+        if self._maybe_fail():
+            return
+        self.state.delay(self.state.profile["first_token_ms"] * 4)
+        host, port = self.server.server_address[:2]
+        n = int(request.get("n") or 1)
+        self._send_json(200, {
+            "created": int(time.time()),
+            "data": [{"url": f"http://{host}:{port}/images/{uuid.uuid4().hex}.png"} for _ in range(n)],
+        })
+
+
+def start_mock_server(host="127.0.0.1", port=0, profile="typical", seed=None, **overrides):
+    """
+    Start the mock server on a daemon thread and return it.
+
+    `profile` is a PROFILES name or dict; keyword overrides such as
+    error_rate=0.05 replace individual settings. The bound address is
+    server.server_address, and server.state counts requests and errors.
+    """
+    settings = dict(PROFILES[profile] if isinstance(profile, str) else profile)
+    settings.update({key: value for key, value in overrides.items() if value is not None})
+
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.state = MockState(settings, seed=seed)
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="typical")
+    parser.add_argument("--first-token-ms", type=float)
+    parser.add_argument("--token-ms", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = start_mock_server(
+        args.host, args.port, args.profile, seed=args.seed,
+        first_token_ms=args.first_token_ms, token_ms=args.token_ms, error_rate=args.error_rate
+    )
+    host, port = server.server_address[:2]
+    print(f"Mock OpenAI server on http://{host}:{port}/v1 (profile: {args.profile})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import heapq
+import math
+
+HISTOGRAM_BINS = 1000  # 0.1 percentage points per bin
+LEADERBOARD_SIZE = 10
+
+
+class RunningStats:
+    """Mean and variance updated one value at a time (Welford's method)"""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class PercentageHistogram:
+    """
+    Streaming percentile sketch for values between 0 and 100.
+
+    Quiz percentages are bounded, so fixed-width bins give a sketch with a
+    known error of one bin width (0.1 points by default) and constant size.
+    A t-digest would only pay off for unbounded values.
+    """
+
+    def __init__(self, bins=HISTOGRAM_BINS, counts=None):
+        self.bins = bins
+        self.counts = list(counts) if counts is not None else [0] * bins
+        self.total = sum(self.counts)
+
+    def _bin(self, value):
+        return min(max(int(value * self.bins / 100.0), 0), self.bins - 1)
+
+    def update(self, value):
+        self.counts[self._bin(value)] += 1
+        self.total += 1
+
+    def percentile(self, q):
+        """Approximate q-th percentile (0-100) of the values seen"""
+        if not self.total:
+            return None
+        target = q / 100.0 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return (i + 0.5) * 100.0 / self.bins
+        return 100.0
+
+    def fraction_below(self, value):
+        """Share of recorded values in lower bins than `value`, 0-1"""
+        if not self.total:
+            return 0.0
+        return sum(self.counts[:self._bin(value)]) / self.total
+
+
+class Leaderboard:
+    """Best `size` results kept in a min-heap, so each update is O(log size)"""
+
+    def __init__(self, size=LEADERBOARD_SIZE, entries=None):
+        self.size = size
+        self.heap = [tuple(entry) for entry in entries or []]
+        heapq.heapify(self.heap)
+
+    def update(self, percentage, record_id, user=None, date=None):
+        # Earlier results win ties, so the id is negated for the min-heap
+        entry = (percentage, -record_id, user, date)
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def top(self):
+        return [
+            {"percentage": percentage, "id": -neg_id, "user": user, "date": date}
+            for percentage, neg_id, user, date in sorted(self.heap, reverse=True)
+        ]
+
+
+class QuizStats:
+    """Aggregates over every quiz result, updated incrementally on save"""
+
+    def __init__(self, running=None, histogram=None, leaderboard=None):
+        self.running = running or RunningStats()
+        self.histogram = histogram or PercentageHistogram()
+        self.leaderboard = leaderboard or Leaderboard()
+
+    def update(self, record):
+        percentage = record["percentage"]
+        self.running.update(percentage)
+        self.histogram.update(percentage)
+        self.leaderboard.update(percentage, record["id"], record.get("user"), record.get("date"))
+
+    @property
+    def count(self):
+        return self.running.count
+
+    def percentile(self, q):
+        return self.histogram.percentile(q)
+
+    def beaten_share(self, percentage):
+        """Share of drivers (0-100) who scored lower than `percentage`"""
+        return self.histogram.fraction_below(percentage) * 100
+
+    def to_dict(self):
+        return {
+            "count": self.running.count,
+            "mean": self.running.mean,
+            "m2": self.running.m2,
+            "bins": self.histogram.bins,
+            "histogram": self.histogram.counts,
+            "top_size": self.leaderboard.size,
+            "top": self.leaderboard.heap,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            RunningStats(data["count"], data["mean"], data["m2"]),
+            PercentageHistogram(data["bins"], data["histogram"]),
+            Leaderboard(data["top_size"], data["top"]),
+        )
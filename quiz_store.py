@@ -0,0 +1,134 @@
+import json
+import threading
+from datetime import datetime
+
+from quiz_stats import QuizStats
+from sqlite_store import SQLiteStore
+
+DEFAULT_DB_NAME = "quiz_scores.sqlite3"
+LEGACY_JSON = "quiz_scores.json"
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def _record(row):
+    return {
+        "id": row[0],
+        "user": row[1],
+        "date": row[2],
+        "score": row[3],
+        "total": row[4],
+        "percentage": row[5],
+    }
+
+
+class QuizStore(SQLiteStore):
+    """
+    Append-only store of quiz results in SQLite (see SQLiteStore).
+
+    Each result is one INSERT, so a save costs the same however long the
+    history is. Scores from the old quiz_scores.json are imported the first
+    time.
+
+    Aggregates (mean, variance, percentile histogram, leaderboard) are kept
+    in the meta table and updated in the same transaction as each insert,
+    so reading them never scans the scores.
+    """
+
+    DEFAULT_DB_NAME = DEFAULT_DB_NAME
+    LEGACY_JSON = LEGACY_JSON
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS scores ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " user TEXT,"
+        " taken_at TEXT NOT NULL,"
+        " score INTEGER NOT NULL,"
+        " total INTEGER NOT NULL,"
+        " percentage REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS scores_user ON scores (user, id)",
+    )
+
+    def _import_item(self, item):
+        self._insert(item.get("score", 0), item.get("total", 0), item.get("user"), item.get("date"))
+
+    def _insert(self, score, total, user=None, taken_at=None):
+        taken_at = taken_at or datetime.now().strftime(DATE_FORMAT)
+        percentage = (score / total) * 100 if total else 0.0
+        cursor = self._db.execute(
+            "INSERT INTO scores (user, taken_at, score, total, percentage) VALUES (?, ?, ?, ?, ?)",
+            (user, taken_at, score, total, percentage)
+        )
+        record = _record((cursor.lastrowid, user, taken_at, score, total, percentage))
+        # The INSERT holds the write lock, so no other process can update
+        # the stats between this read and the write below
+        stats = self._read_stats(before_id=record["id"])
+        stats.update(record)
+        self._write_stats(stats)
+        return record
+
+    def _read_stats(self, before_id=None):
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'stats'").fetchone()
+        if row is not None:
+            return QuizStats.from_dict(json.loads(row[0]))
+        # Stores created before stats were kept: rebuild once from the scores
+        stats = QuizStats()
+        for row in self._db.execute(
+            "SELECT id, user, taken_at, score, total, percentage FROM scores WHERE id < ? ORDER BY id",
+            (before_id if before_id is not None else 2 ** 63 - 1,)
+        ):
+            stats.update(_record(row))
+        return stats
+
+    def _write_stats(self, stats):
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('stats', ?)",
+            (json.dumps(stats.to_dict()),)
+        )
+
+    def add(self, score, total, user=None, taken_at=None):
+        """Record one quiz result and return it as a dict"""
+        with self._lock, self._db:
+            return self._insert(score, total, user, taken_at)
+
+    def recent(self, limit=10):
+        """Most recent results, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, user, taken_at, score, total, percentage FROM scores ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [_record(row) for row in rows]
+
+    def history(self, user, limit=None):
+        """Results for one user, newest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, user, taken_at, score, total, percentage FROM scores"
+                " WHERE user IS ? ORDER BY id DESC LIMIT ?",
+                (user, -1 if limit is None else limit)
+            ).fetchall()
+        return [_record(row) for row in rows]
+
+    def stats(self):
+        """QuizStats over every recorded result"""
+        with self._lock:
+            return self._read_stats()
+
+    def leaderboard(self):
+        return self.stats().leaderboard.top()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_quiz_store():
+    """Process-wide QuizStore"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QuizStore()
+        return _store
@@ -0,0 +1,119 @@
+import io
+import os
+import json
+import time
+import hashlib
+import threading
+
+import requests
+import pandas as pd
+
+from data_cache import CACHE_DIR_NAME
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_TIMEOUT = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared requests session so repeat fetches reuse connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        return _session
+
+
+def http_cache_dir():
+    return os.path.join(os.getcwd(), CACHE_DIR_NAME, "http")
+
+
+def _entry_paths(url, cache_dir):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(cache_dir, key + ".body"), os.path.join(cache_dir, key + ".json")
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def fetch_cached(url, ttl=DEFAULT_TTL, timeout=DEFAULT_TIMEOUT, cache_dir=None):
+    """
+    Return the body of `url`, going to the network as little as possible.
+
+    A copy younger than `ttl` seconds is returned without any request.
+    Older copies are revalidated with If-None-Match / If-Modified-Since, and
+    a 304 just renews them. If the server can't be reached, the last good
+    copy is returned. Raises only when there is nothing cached to fall back on.
+    """
+    cache_dir = cache_dir or http_cache_dir()
+    body_path, meta_path = _entry_paths(url, cache_dir)
+
+    meta = None
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+    if meta is not None and time.time() - meta.get("fetched_at", 0) < ttl:
+        with open(body_path, "rb") as f:
+            return f.read()
+
+    headers = {}
+    if meta is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = get_session().get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and meta is not None:
+            body = None
+        else:
+            response.raise_for_status()
+            body = response.content
+    except requests.RequestException as e:
+        if meta is None:
+            raise
+        print(f"Using cached copy of {url}: {e}")
+        with open(body_path, "rb") as f:
+            return f.read()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if body is None:
+        with open(body_path, "rb") as f:
+            body = f.read()
+    else:
+        _write_atomic(body_path, body)
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    meta["fetched_at"] = time.time()
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    return body
+
+
+def read_remote_csv(url, fallback_path=None, ttl=DEFAULT_TTL, reader=pd.read_csv, **kwargs):
+    """
+    Read a remote CSV through the HTTP cache, falling back to a local copy
+    of the same dataset when the URL has never been fetched and is offline.
+    """
+    try:
+        body = fetch_cached(url, ttl=ttl, **kwargs)
+    except Exception as e:
+        if fallback_path is None or not os.path.exists(fallback_path):
+            raise
+        print(f"Could not fetch {url}, reading {fallback_path} instead: {e}")
+        return reader(fallback_path)
+    return reader(io.BytesIO(body))
@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime
+
+from sqlite_store import SQLiteStore
+
+DEFAULT_DB_NAME = "voice_reports.sqlite3"
+LEGACY_JSON = "voice_reports.json"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+COLUMNS = "id, timestamp, type, location, description"
+
+
+def _timestamp(value):
+    """Reports are stored with sortable 'YYYY-MM-DD HH:MM:SS' text timestamps"""
+    if value is None:
+        value = datetime.now()
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return str(value)
+
+
+def _record(row):
+    return {
+        "id": row[0],
+        "timestamp": row[1],
+        "type": row[2],
+        "location": row[3],
+        "description": row[4],
+    }
+
+
+class ReportStore(SQLiteStore):
+    """
+    Append log of voice and incident reports in SQLite (see SQLiteStore).
+
+    Each report is one INSERT, so writes stay constant-time however many
+    reports exist. B-tree indexes on timestamp, (type, timestamp) and
+    (location, timestamp) answer time-range, per-type and per-location
+    queries in logarithmic time plus the size of the result. Reports from
+    the old voice_reports.json are imported the first time.
+    """
+
+    DEFAULT_DB_NAME = DEFAULT_DB_NAME
+    LEGACY_JSON = LEGACY_JSON
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS reports ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " timestamp TEXT NOT NULL,"
+        " type TEXT,"
+        " location TEXT,"
+        " description TEXT)",
+        "CREATE INDEX IF NOT EXISTS reports_timestamp ON reports (timestamp)",
+        "CREATE INDEX IF NOT EXISTS reports_type ON reports (type, timestamp)",
+        "CREATE INDEX IF NOT EXISTS reports_location ON reports (location, timestamp)",
+    )
+
+    def _import_item(self, report):
+        self._insert(report)
+
+    def _insert(self, report):
+        values = (
+            _timestamp(report.get("timestamp")),
+            report.get("type"),
+            report.get("location"),
+            report.get("description"),
+        )
+        cursor = self._db.execute(
+            "INSERT INTO reports (timestamp, type, location, description) VALUES (?, ?, ?, ?)", values
+        )
+        return _record((cursor.lastrowid,) + values)
+
+    def add(self, report):
+        """
+        Append a report dict with timestamp (datetime or text), type,
+        location and description. Returns the stored record.
+        """
+        with self._lock, self._db:
+            return self._insert(report)
+
+    def _query(self, where, params, limit):
+        sql = f"SELECT {COLUMNS} FROM reports"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        with self._lock:
+            rows = self._db.execute(sql, params + [-1 if limit is None else limit]).fetchall()
+        return [_record(row) for row in rows]
+
+    def between(self, start=None, end=None, report_type=None, location=None, limit=None):
+        """
+        Reports with start <= timestamp < end, newest first. Either bound may
+        be None, and the results can be narrowed to one type or location.
+        """
+        where, params = [], []
+        if report_type is not None:
+            where.append("type = ?")
+            params.append(report_type)
+        if location is not None:
+            where.append("location = ?")
+            params.append(location)
+        if start is not None:
+            where.append("timestamp >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            where.append("timestamp < ?")
+            params.append(_timestamp(end))
+        return self._query(where, params, limit)
+
+    def recent(self, limit=10):
+        return self.between(limit=limit)
+
+    def by_type(self, report_type, start=None, end=None, limit=None):
+        return self.between(start, end, report_type=report_type, limit=limit)
+
+    def at_location(self, location, start=None, end=None, limit=None):
+        return self.between(start, end, location=location, limit=limit)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store():
+    """Process-wide ReportStore"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore()
+        return _store
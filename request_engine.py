@@ -0,0 +1,225 @@
+import os
+import time
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_RPM", "500"))
+TOKENS_PER_MINUTE = int(os.getenv("OPENAI_TPM", "60000"))
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_TRANSIENT_RETRIES = 2
+DEFAULT_COOLDOWN = 2.0
+TRANSIENT_BACKOFF = 0.5
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute / 60` units per second up to `per_minute`"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(float(amount), self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class _Job:
+    def __init__(self, key, session_id, tokens, call):
+        self.key = key
+        self.session_id = session_id
+        self.tokens = tokens
+        self.call = call
+        self.future = Future()
+        self.attempts = 0
+        self.transient_attempts = 0
+
+
+def _is_rate_limit(error):
+    return getattr(error, "status_code", None) == 429
+
+
+def _is_transient(error):
+    """Server errors and dropped connections, worth one more try"""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return DEFAULT_COOLDOWN
+
+
+class RequestEngine:
+    """
+    Dispatcher shared by every Streamlit session in the process.
+
+    It runs an asyncio loop on a background thread. Jobs wait in one queue
+    per session and are taken round-robin, so a busy session can't starve
+    the others. Before dispatch, each job takes a request and its estimated
+    tokens from two token buckets. At most `max_concurrency` calls run at
+    once on a thread pool. Jobs with the same key share one in-flight call.
+    A 429 pauses all dispatch for the provider's Retry-After and puts the
+    job back at the head of its queue. Server errors and dropped connections
+    are retried for that job alone after a short backoff. Calls should be
+    made with SDK retries off (see ai_client.get_dispatch_client) so these
+    errors reach the engine.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_concurrency=MAX_CONCURRENCY):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.coalesced = 0
+        self.rate_limited = 0
+        self.retried = 0
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._queues = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm-request")
+        self._cooldown_until = 0.0
+
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="llm-dispatcher", daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._loop.create_task(self._dispatch())
+        self._started.set()
+        self._loop.run_forever()
+
+    def submit(self, key, call, session_id=None, tokens=1):
+        """
+        Queue `call` (a blocking function) and return (future, is_new).
+
+        If a job with the same key is already queued or running, its future
+        is returned with is_new False and `call` is not used.
+        """
+        with self._inflight_lock:
+            job = self._inflight.get(key) if key is not None else None
+            if job is not None:
+                self.coalesced += 1
+                return job.future, False
+            job = _Job(key, session_id, tokens, call)
+            if key is not None:
+                self._inflight[key] = job
+        self._loop.call_soon_threadsafe(self._enqueue, job)
+        return job.future, True
+
+    def run(self, key, call, session_id=None, tokens=1, timeout=None):
+        """Submit and wait for the result"""
+        future, _ = self.submit(key, call, session_id=session_id, tokens=tokens)
+        return future.result(timeout=timeout)
+
+    def _enqueue(self, job, front=False):
+        queue = self._queues.get(job.session_id)
+        if queue is None:
+            queue = self._queues[job.session_id] = deque()
+        if front:
+            queue.appendleft(job)
+        else:
+            queue.append(job)
+        self._wakeup.set()
+
+    def _next_job(self):
+        """Take the next job round-robin across sessions"""
+        session_id, queue = next(iter(self._queues.items()))
+        job = queue.popleft()
+        del self._queues[session_id]
+        if queue:
+            self._queues[session_id] = queue
+        return job
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            while not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            delay = self._cooldown_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            job = self._next_job()
+            await self.requests.acquire(1)
+            await self.tokens.acquire(job.tokens)
+            self._loop.create_task(self._execute(job))
+
+    async def _execute(self, job):
+        try:
+            result = await self._loop.run_in_executor(self._executor, job.call)
+        except Exception as e:
+            if _is_rate_limit(e) and job.attempts < MAX_RATE_LIMIT_RETRIES:
+                job.attempts += 1
+                self.rate_limited += 1
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + _retry_after(e))
+                self._enqueue(job, front=True)
+                return
+            if _is_transient(e) and job.transient_attempts < MAX_TRANSIENT_RETRIES:
+                job.transient_attempts += 1
+                self.retried += 1
+                delay = TRANSIENT_BACKOFF * 2 ** (job.transient_attempts - 1)
+                self._loop.call_later(delay, self._enqueue, job, True)
+                return
+            self._finish(job, error=e)
+        else:
+            self._finish(job, result=result)
+        finally:
+            self._slots.release()
+
+    def _finish(self, job, result=None, error=None):
+        with self._inflight_lock:
+            if job.key is not None and self._inflight.get(job.key) is job:
+                del self._inflight[job.key]
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+
+    def stats(self):
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "inflight": len(self._inflight),
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "retried": self.retried,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_request_engine():
+    """Process-wide RequestEngine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RequestEngine()
+        return _engine
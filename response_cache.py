@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from data_cache import CACHE_DIR_NAME
+from sqlite_store import SQLiteStore
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+def normalize_question(question):
+    """Lower-case, collapse whitespace and drop trailing punctuation"""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!. ")
+
+
+def make_key(question, system_prompt, model, temperature):
+    """Cache key for one question under one prompt/model configuration"""
+    payload = json.dumps(
+        [normalize_question(question), system_prompt, model, float(temperature)],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(SQLiteStore):
+    """
+    Two-tier cache of assistant answers.
+
+    Lookups check an in-memory LRU first and then a SQLite table (see
+    SQLiteStore) that survives restarts and is shared by every worker on the
+    machine. Entries expire `ttl` seconds after they are stored.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS responses ("
+        " key TEXT PRIMARY KEY,"
+        " value TEXT NOT NULL,"
+        " expires_at REAL NOT NULL)",
+    )
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        super().__init__(path or os.path.join(os.getcwd(), CACHE_DIR_NAME, "responses.sqlite3"))
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached answer for `key`, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.hits_memory += 1
+                    return entry[0]
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._remember(key, row[0], row[1])
+            self.hits_disk += 1
+            return row[0]
+
+    def put(self, key, value):
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._db.commit()
+
+    def purge_expired(self):
+        """Delete expired rows from the on-disk tier"""
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+
+    def stats(self):
+        hits = self.hits_memory + self.hits_disk
+        lookups = hits + self.misses
+        return {
+            "hits_memory": self.hits_memory,
+            "hits_disk": self.hits_disk,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide ResponseCache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
@@ -0,0 +1,179 @@
+import os
+import re
+import math
+import threading
+
+import numpy as np
+
+from dataset_schema import INCIDENT_FILES
+from safety_tips import SafetyTipsGenerator
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+ROAD_FILES = ['data_analysis.csv', 'detailed_analysis.csv']
+
+DEFAULT_TOP_K = 5
+DEFAULT_TOKEN_BUDGET = 300
+CHARS_PER_TOKEN = 4
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'at', 'for', 'with',
+    'is', 'are', 'be', 'it', 'i', 'me', 'my', 'you', 'your', 'do', 'does', 'can',
+    'should', 'what', 'how', 'when', 'why', 'which', 'this', 'that', 'about',
+}
+
+
+def tokenize(text):
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Rough token count, good enough for keeping prompts within budget"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+class BM25Index:
+    """
+    In-memory BM25 index over short text facts.
+
+    Each posting stores its full BM25 term weight, computed once at build
+    time, so a query only adds up the postings of its terms and picks the
+    top k with np.argpartition.
+    """
+
+    def __init__(self, documents):
+        self.documents = list(documents)
+        tokenized = [tokenize(doc) for doc in self.documents]
+        lengths = np.array([len(tokens) for tokens in tokenized], dtype=float)
+        avg_length = lengths.mean() if len(lengths) else 0.0
+
+        postings = {}
+        for doc_id, tokens in enumerate(tokenized):
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((doc_id, tf))
+
+        n_docs = len(self.documents)
+        self._postings = {}
+        for token, entries in postings.items():
+            doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int32)
+            tf = np.array([tf for _, tf in entries], dtype=float)
+            idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_ids] / (avg_length or 1))
+            self._postings[token] = (doc_ids, idf * tf * (BM25_K1 + 1) / (tf + norm))
+
+    def search(self, query, k=DEFAULT_TOP_K):
+        """Return up to k (score, document) pairs, best first"""
+        scores = np.zeros(len(self.documents))
+        for token in set(tokenize(query)):
+            posting = self._postings.get(token)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.documents[i]) for i in top]
+
+
+def road_facts(path):
+    from road_data import read_road_csv
+
+    table = read_road_csv(path)
+    facts = []
+    for row, road in enumerate(table.frame.to_dict('records')):
+        fact = (
+            f"{road['RoadName']} ({road.get('RoadType', 'road')}, {road.get('SpeedLimit')} mph limit, "
+            f"{road.get('Lanes')} lanes, {road.get('TrafficVolume')} traffic, {road.get('Condition')} condition, "
+            f"{road.get('Lighting')} lighting): {road.get('AccidentCount')} accidents, "
+            f"{road.get('FatalAccidents')} fatal."
+        )
+        if 'AccidentType' in road:
+            fact += (
+                f" Example incident: {road['AccidentType']} involving a {road.get('VehicleType')} "
+                f"in {road.get('WeatherCondition')} weather, {road.get('TimeOfDay')}, {road.get('DayOfWeek')}, "
+                f"distraction: {road.get('Distraction')}."
+            )
+        measures = table.measures_for(row)
+        if measures:
+            fact += f" Prevention measures: {', '.join(measures)}."
+        if road.get('SuggestedImprovement'):
+            fact += f" Suggested improvement: {road['SuggestedImprovement']}."
+        facts.append(fact)
+    return facts
+
+
+def incident_facts(path):
+    """One fact per value of each breakdown dimension of an incident file"""
+    from dataset_schema import read_incidents
+    from incident_cube import IncidentCube
+
+    cube = IncidentCube.from_frame(read_incidents(path))
+    label = os.path.splitext(os.path.basename(path))[0].replace('_', ' ')
+    descriptions = {
+        'WeatherCondition': "in {} weather",
+        'TimeOfDay': "in the {}",
+        'DayOfWeek': "on {}",
+        'Distraction': "with distraction: {}",
+        'Speeding': "{}",
+        'SeatbeltUsed': "{}",
+        'AgeBand': "for drivers aged {}",
+    }
+    facts = []
+    for dim, template in descriptions.items():
+        for value, row in cube.breakdown(dim).iterrows():
+            if dim == 'Speeding':
+                value = "while speeding" if value is True else "without speeding"
+            elif dim == 'SeatbeltUsed':
+                value = "with a seatbelt" if value is True else "without a seatbelt"
+            facts.append(
+                f"Incidents {template.format(value)} ({label}): {int(row['count'])} incidents, "
+                f"{int(row['fatal'])} fatal ({row['fatality_rate']:.0f}% fatality rate)."
+            )
+    return facts
+
+
+def build_documents(data_dir=DATA_DIR):
+    documents = []
+    for name in ROAD_FILES:
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            documents.extend(road_facts(path))
+    for name in INCIDENT_FILES:
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            documents.extend(incident_facts(path))
+    documents.extend(f"Safety tip: {tip}" for tip in SafetyTipsGenerator().tips)
+    return documents
+
+
+def build_context(index, question, k=DEFAULT_TOP_K, token_budget=DEFAULT_TOKEN_BUDGET):
+    """The best matching facts for a question, stopping at the token budget"""
+    lines = []
+    used = 0
+    for _, fact in index.search(question, k=k):
+        cost = estimate_tokens(fact) + 1
+        if used + cost > token_budget:
+            break
+        lines.append(f"- {fact}")
+        used += cost
+    return "\n".join(lines)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_retriever():
+    """Process-wide BM25Index over the bundled datasets and safety tips"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = BM25Index(build_documents())
+        return _index
@@ -0,0 +1,130 @@
+import io
+import csv
+
+import numpy as np
+import pandas as pd
+
+MEASURES_COLUMN = 'AccidentPreventionMeasures'
+
+
+class RoadTable:
+    """
+    Road-analysis rows with the variable-length prevention measures stored
+    CSR-style: the measures of row i are
+    measure_names[measure_codes[measure_offsets[i]:measure_offsets[i + 1]]].
+    """
+
+    def __init__(self, frame, measure_offsets, measure_codes, measure_names):
+        self.frame = frame
+        self.measure_offsets = measure_offsets
+        self.measure_codes = measure_codes
+        self.measure_names = measure_names
+
+    def __len__(self):
+        return len(self.frame)
+
+    def measures_for(self, row):
+        """List the measures recorded for one row position"""
+        start, stop = self.measure_offsets[row], self.measure_offsets[row + 1]
+        return [self.measure_names[code] for code in self.measure_codes[start:stop]]
+
+    def measure_row_ids(self):
+        """Row position of every entry in measure_codes"""
+        return np.repeat(np.arange(len(self.frame)), np.diff(self.measure_offsets))
+
+    def rows_with_measure(self, name):
+        """Boolean mask of the rows that list `name` as a measure"""
+        mask = np.zeros(len(self.frame), dtype=bool)
+        if name not in self.measure_names:
+            return mask
+        code = self.measure_names.index(name)
+        mask[self.measure_row_ids()[self.measure_codes == code]] = True
+        return mask
+
+    def measure_counts(self):
+        """How many rows list each measure"""
+        counts = np.bincount(self.measure_codes, minlength=len(self.measure_names))
+        return pd.Series(counts, index=self.measure_names, name='rows').sort_values(ascending=False)
+
+    def to_frame(self):
+        """The rows as a DataFrame with the measures as a list column"""
+        frame = self.frame.copy()
+        frame[MEASURES_COLUMN] = [self.measures_for(row) for row in range(len(frame))]
+        return frame
+
+
+def _open_text(source):
+    if isinstance(source, (bytes, bytearray)):
+        return io.StringIO(source.decode('utf-8'))
+    if isinstance(source, str):
+        return open(source, 'r', newline='', encoding='utf-8')
+    if isinstance(source, io.TextIOBase):
+        return source
+    return io.TextIOWrapper(source, encoding='utf-8', newline='')
+
+
+def _convert(values):
+    try:
+        return pd.to_numeric(pd.Series(values))
+    except (ValueError, TypeError):
+        return pd.Series(values, dtype='category')
+
+
+def read_road_csv(source, measures_column=MEASURES_COLUMN):
+    """
+    Parse data_analysis.csv / detailed_analysis.csv style files in one pass.
+
+    These files write the prevention measures as extra comma-separated
+    fields, so rows have different widths. Fields before the measures column
+    and the fixed columns after it are matched from both ends; whatever is
+    in between is the row's measure list. The ", " padding after each comma
+    is stripped. Rows too short to hold every fixed column can't be matched
+    up and are skipped with a warning. `source` may be a path, bytes or a
+    file object.
+    """
+    f = _open_text(source)
+    try:
+        rows = csv.reader(f, skipinitialspace=True)
+        header = [name.strip() for name in next(rows)]
+        m = header.index(measures_column)
+        trailing = len(header) - m - 1
+        fixed_columns = header[:m] + header[m + 1:]
+
+        columns = [[] for _ in fixed_columns]
+        offsets = [0]
+        codes = []
+        names = []
+        lookup = {}
+
+        for fields in rows:
+            if not fields:
+                continue
+            if len(fields) < len(fixed_columns):
+                print(f"Skipping short row on line {rows.line_num}: "
+                      f"{len(fields)} fields, expected at least {len(fixed_columns)}")
+                continue
+            fields = [field.strip() for field in fields]
+            stop = len(fields) - trailing
+            fixed = fields[:m] + fields[stop:]
+            for column, value in zip(columns, fixed):
+                column.append(value)
+            for name in fields[m:stop]:
+                if not name:
+                    continue
+                code = lookup.get(name)
+                if code is None:
+                    code = lookup[name] = len(names)
+                    names.append(name)
+                codes.append(code)
+            offsets.append(len(codes))
+    finally:
+        if f is not source:
+            f.close()
+
+    frame = pd.DataFrame({name: _convert(values) for name, values in zip(fixed_columns, columns)})
+    return RoadTable(
+        frame,
+        np.asarray(offsets, dtype=np.int64),
+        np.asarray(codes, dtype=np.int32),
+        names
+    )
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+# The road datasets only grade TrafficVolume, so each grade stands in for a
+# nominal number of vehicles per day when normalising by exposure.
+TRAFFIC_VOLUME_VEHICLES = {'Low': 5_000, 'Medium': 15_000, 'High': 30_000}
+RATE_PER_VEHICLES = 10_000
+
+RANKING_METRICS = ['accident_rate', 'fatal_rate', 'AccidentCount', 'FatalAccidents']
+
+ROAD_COLUMNS = ['RoadName', 'RoadType', 'SpeedLimit', 'Lanes', 'TrafficVolume', 'Lighting']
+
+
+def daily_vehicles(volume):
+    """Nominal vehicles per day for a TrafficVolume column"""
+    if pd.api.types.is_numeric_dtype(volume):
+        return volume.astype(float)
+    return volume.astype(str).str.strip().map(TRAFFIC_VOLUME_VEHICLES).astype(float)
+
+
+class RoadRiskIndex:
+    """
+    Per-RoadID accident statistics with precomputed orderings.
+
+    Rankings are stored as row orders for each metric, so top_n() is a slice.
+    Speed-limit range queries binary-search a sorted copy of SpeedLimit, and
+    road-type queries look up a prebuilt list of rows.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats.reset_index(drop=True)
+        self._orders = {}
+        for metric in RANKING_METRICS:
+            values = self.stats[metric].to_numpy(dtype=float)
+            self._orders[metric] = np.lexsort((self.stats['RoadID'].to_numpy(), -np.nan_to_num(values, nan=-np.inf)))
+
+        speeds = self.stats['SpeedLimit'].to_numpy()
+        self._speed_order = np.argsort(speeds, kind='stable')
+        self._sorted_speeds = speeds[self._speed_order]
+
+        self._row_of = {road_id: row for row, road_id in enumerate(self.stats['RoadID'].tolist())}
+
+        self._by_type = {}
+        rank = np.empty(len(self.stats), dtype=np.int64)
+        rank[self._orders['accident_rate']] = np.arange(len(self.stats))
+        for road_type, rows in self.stats.groupby(self.stats['RoadType'].astype(str), sort=False).indices.items():
+            self._by_type[road_type] = rows[np.argsort(rank[rows])]
+
+    @classmethod
+    def from_frame(cls, roads):
+        """Build the index from a road DataFrame with one or more rows per RoadID"""
+        attributes = {col: 'first' for col in ROAD_COLUMNS if col in roads}
+        # Accident counts are per-road attributes repeated on each incident row
+        stats = roads.groupby('RoadID', sort=True).agg({
+            **attributes,
+            'AccidentCount': 'max',
+            'FatalAccidents': 'max',
+        }).reset_index()
+
+        exposure = daily_vehicles(stats['TrafficVolume'])
+        stats['daily_vehicles'] = exposure
+        stats['accident_rate'] = stats['AccidentCount'] / exposure * RATE_PER_VEHICLES
+        stats['fatal_rate'] = stats['FatalAccidents'] / exposure * RATE_PER_VEHICLES
+        stats['fatal_share'] = (stats['FatalAccidents'] / stats['AccidentCount']).fillna(0)
+        return cls(stats)
+
+    @classmethod
+    def from_table(cls, table):
+        """Build the index from a road_data.RoadTable"""
+        return cls.from_frame(table.frame)
+
+    def top_n(self, n=5, by='accident_rate'):
+        """The n most dangerous roads by one of RANKING_METRICS"""
+        if by not in self._orders:
+            raise KeyError(f"Unknown ranking metric: {by}")
+        return self.stats.iloc[self._orders[by][:n]]
+
+    def speed_limit_range(self, low, high):
+        """Roads with low <= SpeedLimit <= high, ordered by speed limit"""
+        start = np.searchsorted(self._sorted_speeds, low, side='left')
+        stop = np.searchsorted(self._sorted_speeds, high, side='right')
+        return self.stats.iloc[self._speed_order[start:stop]]
+
+    def road_type(self, road_type, n=None):
+        """Roads of one type, most dangerous first"""
+        rows = self._by_type.get(road_type, np.array([], dtype=np.int64))
+        return self.stats.iloc[rows[:n]]
+
+    def road(self, road_id):
+        """Statistics for a single RoadID"""
+        row = self._row_of.get(road_id)
+        return self.stats.iloc[row] if row is not None else None
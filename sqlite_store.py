@@ -0,0 +1,62 @@
+import os
+import json
+import sqlite3
+import threading
+
+
+class SQLiteStore:
+    """
+    Shared setup for the app's append-only SQLite stores.
+
+    One connection is shared by all threads and guarded by `_lock`. It runs
+    in WAL mode, so readers don't block the writer, with synchronous=NORMAL,
+    which fsyncs at WAL checkpoints rather than on every commit. SQLite's
+    file locking serialises writers from other processes. Subclasses list
+    their tables and indexes in SCHEMA and get a `meta` key/value table as
+    well. Stores with a LEGACY_JSON file pass its records to _import_item()
+    the first time the database is opened.
+    """
+
+    DEFAULT_DB_NAME = None
+    LEGACY_JSON = None
+    SCHEMA = ()
+
+    def __init__(self, path=None, legacy_path=None):
+        self.path = path or os.path.join(os.getcwd(), self.DEFAULT_DB_NAME)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in self.SCHEMA:
+            self._db.execute(statement)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+
+        if legacy_path is None and self.LEGACY_JSON is not None:
+            legacy_path = os.path.join(os.path.dirname(os.path.abspath(self.path)), self.LEGACY_JSON)
+        if legacy_path is not None:
+            self._import_legacy(legacy_path)
+
+    def _import_legacy(self, legacy_path):
+        with self._lock, self._db:
+            if self._db.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+                return
+            try:
+                with open(legacy_path, "r") as f:
+                    legacy = json.load(f)
+            except (OSError, ValueError):
+                legacy = []
+            records = self._legacy_records(legacy)
+            for item in records:
+                self._import_item(item)
+            self._db.execute("INSERT INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(len(records)),))
+
+    def _legacy_records(self, legacy):
+        """The list of records in the decoded legacy JSON file"""
+        return legacy
+
+    def _import_item(self, item):
+        """Insert one record from the legacy JSON file"""
+        raise NotImplementedError
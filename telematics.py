@@ -0,0 +1,277 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+MPH_TO_MPS = 0.44704
+DEFAULT_SPEED_LIMIT = 35.0  # mph, used when neither the sample nor the road says
+
+# Sample fields. timestamp is in seconds, speed in mph, accelerations in
+# m/s^2 (accel_x forward, accel_y left), heading in degrees, lane_offset in
+# metres from the lane centre (optional, from a lane camera).
+SAMPLE_FIELDS = ['timestamp', 'speed', 'accel_x', 'accel_y', 'heading', 'lat', 'lon', 'phone_active']
+
+# Each detector turns on when its signal reaches `on`, stays on until the
+# signal falls back to `off` (hysteresis), and raises an alert only once it
+# has stayed on for `min_duration` seconds (debounce).
+DETECTORS = {
+    'speeding': {'on': 5.0, 'off': 0.0, 'min_duration': 3.0},        # mph over the limit
+    'sudden_brake': {'on': 3.9, 'off': 2.5, 'min_duration': 0.3},    # m/s^2 deceleration
+    'sharp_turn': {'on': 4.0, 'off': 2.5, 'min_duration': 0.3},      # m/s^2 lateral
+    'lane_departure': {'on': 0.6, 'off': 0.3, 'min_duration': 0.5},  # m/s drift, or m of lane_offset
+    'phone_use': {'on': 1.0, 'off': 0.0, 'min_duration': 2.0},       # phone_active flag
+}
+LANE_OFFSET_THRESHOLDS = {'on': 0.9, 'off': 0.6}
+DRIFT_WINDOW = 2.0  # seconds of heading history used to estimate drift
+MIN_DRIFT_SPEED = 25.0  # mph; below this heading changes are manoeuvres
+MAX_DRIFT_ANGLE = 10.0  # degrees; larger heading changes are turns, not drift
+
+
+def speed_limits_from_roads(roads):
+    """RoadID -> SpeedLimit lookup from a road DataFrame"""
+    limits = roads.drop_duplicates('RoadID').set_index('RoadID')['SpeedLimit']
+    return limits.astype(float).to_dict()
+
+
+def hysteresis(on_mask, off_mask, initial=False):
+    """
+    Latch a boolean state: True from where `on_mask` holds until `off_mask`
+    holds. Samples matching neither keep the previous state, which is
+    forward-filled with a running maximum over the last decisive index.
+    """
+    n = len(on_mask)
+    codes = np.where(on_mask, 1, np.where(off_mask, 0, -1))
+    last = np.where(codes >= 0, np.arange(n), -1)
+    np.maximum.accumulate(last, out=last)
+    return np.where(last >= 0, codes[np.maximum(last, 0)] == 1, bool(initial))
+
+
+class _DebounceState:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.active = False
+        self.run_start = np.nan
+        self.fired = False
+
+
+def debounce(active, timestamps, carry, min_duration):
+    """
+    Indices where a run of `active` samples first reaches `min_duration`
+    seconds. `carry` holds the run in progress at the end of the previous
+    batch and is updated in place.
+    """
+    n = len(active)
+    previous = np.empty(n, dtype=bool)
+    previous[0] = carry.active
+    previous[1:] = active[:-1]
+    starts = active & ~previous
+
+    start_ts = np.where(starts, timestamps, np.nan)
+    if active[0] and carry.active:
+        start_ts[0] = carry.run_start
+    last = np.where(~np.isnan(start_ts), np.arange(n), 0)
+    np.maximum.accumulate(last, out=last)
+    run_start = np.where(active, start_ts[last], np.nan)
+
+    with np.errstate(invalid='ignore'):
+        due = active & (timestamps - run_start >= min_duration)
+    was_due = np.empty(n, dtype=bool)
+    was_due[0] = carry.active and carry.fired
+    was_due[1:] = due[:-1]
+    fire = np.flatnonzero(due & ~was_due)
+
+    carry.active = bool(active[-1])
+    carry.run_start = float(run_start[-1]) if carry.active else np.nan
+    carry.fired = bool(due[-1])
+    return fire
+
+
+def _column(samples, name, n, default=np.nan):
+    if name in samples and samples[name] is not None:
+        return np.asarray(samples[name], dtype=float)
+    return np.full(n, default, dtype=float)
+
+
+class VehicleDetector:
+    """
+    Event detection for one vehicle's sample stream.
+
+    Samples arrive in batches (dict of arrays or DataFrame, in time order).
+    Every detector runs over the whole batch with NumPy, and the hysteresis
+    state, run in progress and recent headings are carried to the next
+    batch, so splitting a stream differently raises the same alerts.
+    """
+
+    def __init__(self, vehicle_id=None, speed_limit=DEFAULT_SPEED_LIMIT, speed_limits=None, detectors=None):
+        self.vehicle_id = vehicle_id
+        self.speed_limit = speed_limit
+        self.speed_limits = speed_limits or {}
+        self.detectors = detectors or DETECTORS
+        self.samples = 0
+        self._state = {name: False for name in self.detectors}
+        self._runs = {name: _DebounceState() for name in self.detectors}
+        self._heading_ts = np.empty(0)
+        self._heading = np.empty(0)
+
+    def _limits(self, samples, n):
+        limits = _column(samples, 'speed_limit', n)
+        if 'road_id' in samples and self.speed_limits:
+            by_road = pd.Series(np.asarray(samples['road_id'])).map(self.speed_limits).to_numpy(dtype=float)
+            limits = np.where(np.isnan(limits), by_road, limits)
+        return np.where(np.isnan(limits), self.speed_limit, limits)
+
+    def _drift(self, timestamps, speed, heading):
+        """Lateral speed (m/s) implied by the heading change over DRIFT_WINDOW"""
+        all_ts = np.concatenate([self._heading_ts, timestamps])
+        all_heading = np.concatenate([self._heading, heading])
+        past = np.searchsorted(all_ts, timestamps - DRIFT_WINDOW, side='left')
+        change = (all_heading[len(self._heading_ts):] - all_heading[past] + 180.0) % 360.0 - 180.0
+
+        keep = all_ts >= timestamps[-1] - DRIFT_WINDOW
+        self._heading_ts = all_ts[keep]
+        self._heading = all_heading[keep]
+        drift = np.abs(speed * MPH_TO_MPS * np.sin(np.radians(change)))
+        return np.where(np.abs(change) <= MAX_DRIFT_ANGLE, drift, 0.0)
+
+    def _signals(self, samples, n):
+        timestamps = _column(samples, 'timestamp', n)
+        speed = _column(samples, 'speed', n)
+        accel_x = _column(samples, 'accel_x', n)
+        accel_y = _column(samples, 'accel_y', n)
+
+        signals = {
+            'speeding': speed - self._limits(samples, n),
+            'sudden_brake': -accel_x,
+            'sharp_turn': np.abs(accel_y),
+            'phone_use': _column(samples, 'phone_active', n, default=0.0),
+        }
+
+        lane_offset = _column(samples, 'lane_offset', n)
+        if not np.isnan(lane_offset).all():
+            signals['lane_departure'] = (np.abs(lane_offset), LANE_OFFSET_THRESHOLDS)
+        else:
+            # Without a lane camera, a steady heading drift at speed while the
+            # car isn't turning hard is the best available proxy
+            drift = self._drift(timestamps, speed, _column(samples, 'heading', n))
+            turning = np.abs(accel_y) >= self.detectors['sharp_turn']['off']
+            signals['lane_departure'] = np.where((speed >= MIN_DRIFT_SPEED) & ~turning, drift, 0.0)
+        return timestamps, signals
+
+    def process(self, samples):
+        """Run every detector over one batch and return the alerts raised"""
+        n = len(samples['timestamp'])
+        if n == 0:
+            return []
+        timestamps, signals = self._signals(samples, n)
+        lat = _column(samples, 'lat', n)
+        lon = _column(samples, 'lon', n)
+
+        events = []
+        for name, settings in self.detectors.items():
+            signal = signals.get(name)
+            if signal is None:
+                continue
+            thresholds = settings
+            if isinstance(signal, tuple):
+                signal, thresholds = signal
+            with np.errstate(invalid='ignore'):
+                on = signal >= thresholds['on']
+                if not self._state[name] and not on.any():
+                    # Nothing can switch on in this batch, the usual case
+                    self._runs[name].reset()
+                    continue
+                off = signal <= thresholds['off']
+            active = hysteresis(on, off, self._state[name])
+            self._state[name] = bool(active[-1])
+
+            for i in debounce(active, timestamps, self._runs[name], settings['min_duration']):
+                events.append({
+                    'type': name,
+                    'vehicle_id': self.vehicle_id,
+                    'timestamp': float(timestamps[i]),
+                    'value': float(signal[i]),
+                    'lat': float(lat[i]),
+                    'lon': float(lon[i]),
+                })
+
+        self.samples += n
+        events.sort(key=lambda event: event['timestamp'])
+        return events
+
+
+class TelematicsEngine:
+    """Keeps one VehicleDetector per vehicle and routes batches to it"""
+
+    def __init__(self, speed_limit=DEFAULT_SPEED_LIMIT, speed_limits=None):
+        self.speed_limit = speed_limit
+        self.speed_limits = speed_limits or {}
+        self._vehicles = {}
+        self._lock = threading.Lock()
+
+    def detector(self, vehicle_id):
+        with self._lock:
+            detector = self._vehicles.get(vehicle_id)
+            if detector is None:
+                detector = self._vehicles[vehicle_id] = VehicleDetector(
+                    vehicle_id, self.speed_limit, self.speed_limits
+                )
+            return detector
+
+    def process(self, vehicle_id, samples):
+        return self.detector(vehicle_id).process(samples)
+
+    def forget(self, vehicle_id):
+        with self._lock:
+            self._vehicles.pop(vehicle_id, None)
+
+    def __len__(self):
+        return len(self._vehicles)
+
+
+def simulate_drive(duration=60.0, hz=10, seed=None, start=0.0, speed_limit=DEFAULT_SPEED_LIMIT,
+                   events=('speeding', 'sudden_brake', 'sharp_turn', 'lane_departure', 'phone_use')):
+    """
+    Synthetic samples for one drive with each of `events` staged once, in
+    order, at evenly spaced points. Returns a dict of arrays.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(duration * hz)
+    t = start + np.arange(n) / hz
+    speed = speed_limit - 3 + rng.normal(0, 0.5, n)
+    accel_x = rng.normal(0, 0.3, n)
+    accel_y = rng.normal(0, 0.3, n)
+    heading = np.full(n, 90.0) + rng.normal(0, 0.05, n)
+    phone = np.zeros(n)
+
+    slot = n // (len(events) + 1)
+    for k, event in enumerate(events, start=1):
+        i = k * slot
+        if event == 'speeding':
+            speed[i:i + 6 * hz] = speed_limit + 12 + rng.normal(0, 0.5, len(speed[i:i + 6 * hz]))
+        elif event == 'sudden_brake':
+            accel_x[i:i + hz] = -6.0
+        elif event == 'sharp_turn':
+            accel_y[i:i + hz] = 5.0
+            heading[i:] += np.clip(np.arange(n - i) / hz, 0, 1) * 90.0
+        elif event == 'lane_departure':
+            heading[i:i + 2 * hz] += 2.5
+        elif event == 'phone_use':
+            phone[i:i + 4 * hz] = 1.0
+
+    step = speed * MPH_TO_MPS / hz
+    theta = np.radians(heading)
+    lat = 37.3382 + np.cumsum(step * np.cos(theta)) / 111_320
+    lon = -121.8863 + np.cumsum(step * np.sin(theta)) / 88_000
+    return {
+        'timestamp': t,
+        'speed': speed,
+        'accel_x': accel_x,
+        'accel_y': accel_y,
+        'heading': heading % 360.0,
+        'lat': lat,
+        'lon': lon,
+        'phone_active': phone,
+        'speed_limit': np.full(n, float(speed_limit)),
+    }
@@ -0,0 +1,399 @@
+"""
+Live vehicle telemetry ingestion.
+
+Vehicles connect over TCP and send one JSON sample per line, e.g.
+
+    {"vehicle_id": "car-1", "timestamp": 12.3, "speed": 41.0, "accel_x": -0.2, ...}
+
+Samples are batched per vehicle into the telematics detectors, and the
+alerts they raise are published on a thread-safe queue the Streamlit app
+polls.
+
+    python telemetry_service.py serve --port 8700
+    python telemetry_service.py simulate --port 8700 --vehicles 1000 --duration 30
+"""
+import os
+import json
+import math
+import time
+import queue
+import asyncio
+import argparse
+import threading
+from collections import deque
+
+import numpy as np
+
+from road_data import read_road_csv
+from telematics import TelematicsEngine, simulate_drive, speed_limits_from_roads
+
+DEFAULT_HOST = os.getenv("TELEMETRY_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("TELEMETRY_PORT", "8700"))
+RING_SIZE = 600  # recent samples kept per vehicle (a minute at 10 Hz)
+QUEUE_SIZE = 50_000  # samples waiting for detection before readers pause
+VEHICLE_BATCH = 20  # samples per detector call
+MAX_LATENCY = 0.5  # seconds a sample may wait for its batch to fill
+FLUSH_INTERVAL = 0.1  # seconds between checks for batches past MAX_LATENCY
+ALERT_QUEUE_SIZE = 10_000
+IDLE_TIMEOUT = 300.0  # seconds without samples before a vehicle's state is dropped
+IDLE_SWEEP_INTERVAL = 10.0  # seconds between scans for idle vehicles
+MAX_LINE_BYTES = 64 * 1024
+
+NUMERIC_FIELDS = ['timestamp', 'speed', 'accel_x', 'accel_y', 'heading', 'lat', 'lon',
+                  'phone_active', 'speed_limit', 'lane_offset']
+
+
+def _parse(line):
+    """
+    Decode one sample line and coerce its numeric fields to float, so a bad
+    value is rejected on arrival instead of failing its whole batch later.
+    Raises ValueError, KeyError or TypeError for an unusable sample.
+    """
+    sample = json.loads(line)
+    vehicle_id = sample['vehicle_id']
+    # Ids key several dicts, so they must be hashable and stable
+    if isinstance(vehicle_id, bool) or not isinstance(vehicle_id, (str, int)):
+        raise TypeError(f"vehicle_id must be a string or integer, not {type(vehicle_id).__name__}")
+    for field in NUMERIC_FIELDS:
+        value = sample.get(field)
+        if value is not None:
+            sample[field] = float(value)
+    if not math.isfinite(sample['timestamp']):
+        raise ValueError(f"timestamp must be finite, not {sample['timestamp']}")
+    return vehicle_id, sample
+
+
+def _columns(samples):
+    """List of sample dicts -> dict of float arrays for the detector"""
+    columns = {}
+    for field in NUMERIC_FIELDS:
+        values = [sample.get(field) for sample in samples]
+        if field == 'timestamp' or any(value is not None for value in values):
+            columns[field] = np.array([np.nan if value is None else value for value in values], dtype=float)
+    road_ids = [sample.get('road_id') for sample in samples]
+    if any(road_id is not None for road_id in road_ids):
+        columns['road_id'] = road_ids
+    return columns
+
+
+class TelemetryService:
+    """
+    Asyncio TCP server feeding vehicle samples to a TelematicsEngine.
+
+    Every connection handler parses lines and puts samples on one bounded
+    queue. Samples with a non-numeric field, or a timestamp older than the
+    vehicle's previous one, are counted as invalid and dropped. When detection falls behind, the queue fills, the handlers stop
+    reading and TCP flow control slows the senders down. A single worker
+    drains the queue into per-vehicle batches and runs a batch through the
+    vehicle's detector once it holds `vehicle_batch` samples or its oldest
+    sample has waited `max_latency` seconds, since a detector call costs
+    about the same for one sample as for fifty. Alerts go to `alerts`, a
+    queue.Queue that other threads can read; when nobody reads it the
+    oldest alerts are dropped. A vehicle that sends nothing for
+    `idle_timeout` seconds loses its recent samples and detector state.
+    `speed_limits` maps road ids to posted limits for the detectors (see
+    speed_limits_from_roads) when no `engine` is given.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, engine=None, ring_size=RING_SIZE,
+                 queue_size=QUEUE_SIZE, vehicle_batch=VEHICLE_BATCH, max_latency=MAX_LATENCY,
+                 flush_interval=FLUSH_INTERVAL, idle_timeout=IDLE_TIMEOUT, speed_limits=None):
+        self.host = host
+        self.port = port
+        self.engine = engine or TelematicsEngine(speed_limits=speed_limits)
+        self.ring_size = ring_size
+        self.queue_size = queue_size
+        self.vehicle_batch = vehicle_batch
+        self.max_latency = max_latency
+        self.flush_interval = flush_interval
+        self.idle_timeout = idle_timeout
+        self.alerts = queue.Queue(maxsize=ALERT_QUEUE_SIZE)
+        self.recent = {}
+        self.last_seen = {}
+        self.last_timestamp = {}
+        self.connections = 0
+        self.received = 0
+        self.processed = 0
+        self.invalid = 0
+        self.evicted = 0
+        self.dropped_alerts = 0
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._writers = set()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._samples = asyncio.Queue(maxsize=self.queue_size)
+        self._worker = asyncio.create_task(self._detect())
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_LINE_BYTES, backlog=4096
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                try:
+                    vehicle_id, sample = _parse(line)
+                except (ValueError, KeyError, TypeError):
+                    self.invalid += 1
+                    continue
+                # The detectors assume each vehicle's samples arrive in time order
+                if sample['timestamp'] < self.last_timestamp.get(vehicle_id, -math.inf):
+                    self.invalid += 1
+                    continue
+                self.last_timestamp[vehicle_id] = sample['timestamp']
+                self.received += 1
+                ring = self.recent.get(vehicle_id)
+                if ring is None:
+                    ring = self.recent[vehicle_id] = deque(maxlen=self.ring_size)
+                ring.append(sample)
+                self.last_seen[vehicle_id] = self._loop.time()
+                # Blocks while the queue is full, which is the backpressure
+                await self._samples.put((vehicle_id, sample))
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _detect(self):
+        pending = {}  # vehicle_id -> (first arrival time, samples)
+        next_flush = self._loop.time() + self.flush_interval
+        next_sweep = self._loop.time() + IDLE_SWEEP_INTERVAL
+        while True:
+            now = self._loop.time()
+            if now >= next_flush:
+                stale = [vid for vid, (since, _) in pending.items() if now - since >= self.max_latency]
+                for vehicle_id in stale:
+                    self._run_batch(vehicle_id, pending.pop(vehicle_id)[1])
+                next_flush = now + self.flush_interval
+            if now >= next_sweep:
+                self._evict_idle(now, pending)
+                next_sweep = now + min(IDLE_SWEEP_INTERVAL, self.idle_timeout)
+
+            try:
+                vehicle_id, sample = self._samples.get_nowait()
+            except asyncio.QueueEmpty:
+                try:
+                    vehicle_id, sample = await asyncio.wait_for(self._samples.get(), next_flush - now)
+                except asyncio.TimeoutError:
+                    continue
+
+            entry = pending.get(vehicle_id)
+            if entry is None:
+                entry = pending[vehicle_id] = (now, [])
+            entry[1].append(sample)
+            if len(entry[1]) >= self.vehicle_batch:
+                del pending[vehicle_id]
+                self._run_batch(vehicle_id, entry[1])
+
+    def _run_batch(self, vehicle_id, samples):
+        try:
+            events = self.engine.process(vehicle_id, _columns(samples))
+        except Exception as e:
+            print(f"Telemetry detection failed for {vehicle_id}: {e}")
+            events = []
+        for event in events:
+            self._publish(event)
+        self.processed += len(samples)
+
+    def _evict_idle(self, now, pending):
+        """Drop the samples and detector state of vehicles that went quiet"""
+        idle = [vid for vid, seen in self.last_seen.items()
+                if now - seen >= self.idle_timeout and vid not in pending]
+        for vehicle_id in idle:
+            del self.last_seen[vehicle_id]
+            self.last_timestamp.pop(vehicle_id, None)
+            self.recent.pop(vehicle_id, None)
+            self.engine.forget(vehicle_id)
+        self.evicted += len(idle)
+
+    def _publish(self, event):
+        while True:
+            try:
+                self.alerts.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.alerts.get_nowait()
+                    self.dropped_alerts += 1
+                except queue.Empty:
+                    pass
+
+    def drain_alerts(self, limit=None):
+        """Take the alerts published so far (at most `limit`)"""
+        events = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self.alerts.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def start_in_background(self):
+        """Run the service on its own event loop thread and return once it listens"""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            loop.run_forever()
+
+            # stop() ended the loop: let the cancelled tasks unwind, then close it
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="telemetry-service", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def _shutdown(self):
+        self._server.close()
+        self._worker.cancel()
+        for writer in list(self._writers):
+            writer.close()
+        if self._thread is not None:
+            self._loop.stop()
+
+    def stop(self):
+        """
+        Stop accepting vehicles, close open connections and cancel detection.
+        A service started with start_in_background() also ends its loop
+        thread before this returns.
+        """
+        if self._loop is None or self._server is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._shutdown)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def stats(self):
+        return {
+            "connections": self.connections,
+            "vehicles": len(self.recent),
+            "received": self.received,
+            "processed": self.processed,
+            "queued": self._samples.qsize() if self._loop else 0,
+            "invalid": self.invalid,
+            "evicted": self.evicted,
+            "dropped_alerts": self.dropped_alerts,
+        }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_telemetry_service(host=DEFAULT_HOST, port=DEFAULT_PORT, speed_limits=None):
+    """
+    Process-wide TelemetryService, started in the background on first use.
+    The arguments only apply to that first call.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TelemetryService(host, port, speed_limits=speed_limits).start_in_background()
+        return _service
+
+
+async def _drive(host, port, vehicle_id, duration, hz, seed, realtime):
+    samples = simulate_drive(duration=duration, hz=hz, seed=seed)
+    fields = list(samples)
+    reader, writer = await asyncio.open_connection(host, port)
+    start = time.monotonic()
+    try:
+        for i in range(len(samples['timestamp'])):
+            sample = {field: float(samples[field][i]) for field in fields}
+            sample['vehicle_id'] = vehicle_id
+            writer.write(json.dumps(sample).encode("utf-8") + b"\n")
+            if realtime:
+                delay = start + sample['timestamp'] - time.monotonic()
+                if delay > 0:
+                    await writer.drain()
+                    await asyncio.sleep(delay)
+            elif i % 100 == 0:
+                await writer.drain()
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def simulate(host=DEFAULT_HOST, port=DEFAULT_PORT, vehicles=100, duration=30.0, hz=10,
+                   realtime=True, seed=0):
+    """Drive `vehicles` simulated cars against a running service, one connection each"""
+    await asyncio.gather(*(
+        _drive(host, port, f"sim-{i}", duration, hz, seed + i, realtime) for i in range(vehicles)
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DriveSafe live telemetry service")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = sub.add_parser("serve", help="accept vehicle connections")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--roads", help="road CSV (e.g. detailed_analysis.csv) with per-road speed limits")
+
+    sim_parser = sub.add_parser("simulate", help="stream simulated vehicles to a service")
+    sim_parser.add_argument("--host", default=DEFAULT_HOST)
+    sim_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sim_parser.add_argument("--vehicles", type=int, default=100)
+    sim_parser.add_argument("--duration", type=float, default=30.0, help="seconds of driving per vehicle")
+    sim_parser.add_argument("--hz", type=int, default=10)
+    sim_parser.add_argument("--fast", action="store_true", help="send as fast as possible instead of in real time")
+    sim_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        speed_limits = speed_limits_from_roads(read_road_csv(args.roads).frame) if args.roads else None
+        service = TelemetryService(args.host, args.port, speed_limits=speed_limits).start_in_background()
+        print(f"Telemetry service listening on {args.host}:{service.port}")
+        try:
+            while True:
+                time.sleep(5)
+                for event in service.drain_alerts():
+                    print(f"{event['vehicle_id']}: {event['type']} at t={event['timestamp']:.1f}s")
+                print(service.stats())
+        except KeyboardInterrupt:
+            service.stop()
+    else:
+        start = time.perf_counter()
+        asyncio.run(simulate(args.host, args.port, args.vehicles, args.duration, args.hz,
+                             realtime=not args.fast, seed=args.seed))
+        samples = args.vehicles * int(args.duration * args.hz)
+        elapsed = time.perf_counter() - start
+        print(f"Sent {samples} samples from {args.vehicles} vehicles in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import io
+
+from dataset_schema import read_incidents
+from incident_stream import fatality_flags
+
+HEADER = "IncidentID,Age,TimeOfDay,DayOfWeek,WeatherCondition,Distraction,Speeding,SeatbeltUsed,Fatality\n"
+
+
+def _read(fatality_values, age="20"):
+    rows = "".join(f"INC{i},{age},Evening,Friday,Clear,Phone,No,No,{value}\n"
+                   for i, value in enumerate(fatality_values))
+    return read_incidents(io.BytesIO((HEADER + rows).encode("utf-8")))
+
+
+def test_yes_no_cells_ignore_case_and_agree_with_fatality_flags():
+    frame = _read(["YES", "TRUE", "y", " Yes ", "1", "No", "", "Maybe", "false"])
+    expected = [True] * 5 + [False] * 4
+    assert frame['Fatality'].tolist() == expected
+    assert fatality_flags(frame['Fatality']).tolist() == [int(flag) for flag in expected]
+    assert fatality_flags(frame['Fatality'].map({True: "YES", False: "no"})).tolist() == [int(flag) for flag in expected]
+
+
+def test_unreadable_ages_become_missing():
+    frame = _read(["Yes"], age="unknown")
+    assert frame['Age'].isna().all()
+    assert str(frame['Age'].dtype) == "Int8"
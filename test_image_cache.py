@@ -0,0 +1,71 @@
+import os
+import json
+
+from image_cache import ImageCache
+
+
+def _download(cache, name, data):
+    path = cache.temp_path(name)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def test_workers_sharing_a_directory_see_each_others_entries(tmp_path):
+    # Two instances on one root behave like two app workers
+    first = ImageCache(str(tmp_path), max_bytes=10_000)
+    second = ImageCache(str(tmp_path), max_bytes=10_000)
+
+    paths = first.put("a", [_download(first, "a1", b"x" * 100), _download(first, "a2", b"y" * 100)], prompt="a")
+    second.put("b", [_download(second, "b1", b"x" * 100)], prompt="b")
+
+    assert second.get("a") == paths
+    assert first.get("b") == [paths[0]]
+    assert first.stats()["entries"] == second.stats()["entries"] == 2
+    assert first.stats()["objects"] == 2
+
+
+def test_eviction_keeps_objects_other_entries_still_use(tmp_path):
+    first = ImageCache(str(tmp_path), max_bytes=280)
+    second = ImageCache(str(tmp_path), max_bytes=280)
+
+    first.put("old", [_download(first, "o1", b"s" * 100), _download(first, "o2", b"v" * 50)])
+    shared = second.put("new", [_download(second, "n1", b"s" * 100), _download(second, "n2", b"t" * 100)])
+    # Evicting "old" drops its reference to the shared object, not the file
+    first.put("newest", [_download(first, "n3", b"u" * 40)])
+
+    assert first.get("old") is None
+    assert second.get("new") == shared
+    assert all(os.path.exists(path) for path in shared)
+    assert first.total_bytes() == 240
+
+
+def test_hits_refresh_last_used(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=250)
+    cache.put("a", [_download(cache, "a", b"a" * 100)])
+    cache.put("b", [_download(cache, "b", b"b" * 100)])
+    assert cache.get("a") is not None
+    cache.put("c", [_download(cache, "c", b"c" * 100)])
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_legacy_manifest_is_imported(tmp_path):
+    objects = tmp_path / "objects"
+    objects.mkdir()
+    (objects / "d1.png").write_bytes(b"z" * 10)
+    manifest = {
+        "entries": {
+            "kept": {"objects": ["d1"], "prompt": "p", "created": 1.0, "last_used": 2.0},
+            "lost": {"objects": ["gone"], "created": 1.0, "last_used": 2.0},
+        },
+        "objects": {"d1": {"bytes": 10, "refs": 1}},
+    }
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+    cache = ImageCache(str(tmp_path))
+    assert cache.get("kept") == [str(objects / "d1.png")]
+    assert cache.get("lost") is None
+    assert cache.stats()["bytes"] == 10
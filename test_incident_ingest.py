@@ -0,0 +1,96 @@
+import os
+import json
+
+import pandas as pd
+
+from dataset_schema import read_incidents
+from incident_cube import IncidentCube, cube_path_for
+from incident_ingest import IncrementalIncidentLoader
+
+HEADER = "IncidentID,Age,TimeOfDay,DayOfWeek,WeatherCondition,Distraction,Speeding,SeatbeltUsed,Fatality\n"
+
+
+def _row(i):
+    return f"INC{i:04d},{16 + i % 10},Evening,Friday,Clear,Phone,No,Yes,{'Yes' if i % 3 else 'No'}\n"
+
+
+def _write(path, text, mode='w'):
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def test_append_with_partial_trailing_line(tmp_path):
+    path = str(tmp_path / "incidents.csv")
+    _write(path, HEADER + "".join(_row(i) for i in range(10)))
+    loader = IncrementalIncidentLoader(path)
+    assert len(loader.refresh()) == 10
+
+    # A writer has flushed two full rows and half of a third
+    third = _row(12)
+    _write(path, _row(10) + _row(11) + third[:9], mode='a')
+    assert len(loader.refresh()) == 12
+    assert loader.cube.rows == 12
+    assert loader.cube.source is None
+
+    _write(path, third[9:], mode='a')
+    frame = loader.refresh()
+    assert len(frame) == 13
+    assert loader.cube.rows == 13
+
+    expected = read_incidents(path)
+    expected.index = range(len(expected))
+    pd.testing.assert_frame_equal(frame, expected)
+    assert int(loader.cube.cells['fatal'].sum()) == int(expected['Fatality'].sum())
+
+
+def test_same_size_rewrite_reloads(tmp_path):
+    path = str(tmp_path / "incidents.csv")
+    _write(path, HEADER + "".join(_row(i) for i in range(5)))
+    loader = IncrementalIncidentLoader(path)
+    assert not loader.refresh()['Speeding'].any()
+
+    # Same length, same first and last line, different middle
+    text = HEADER + _row(0) + _row(1).replace(",No,Yes,", ",Yes,No,") + "".join(_row(i) for i in range(2, 5))
+    stat = os.stat(path)
+    _write(path, text)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert os.path.getsize(path) == stat.st_size
+
+    assert loader.refresh()['Speeding'].sum() == 1
+
+
+def test_cold_start_reuses_saved_cube(tmp_path, monkeypatch):
+    path = str(tmp_path / "incidents.csv")
+    _write(path, HEADER + "".join(_row(i) for i in range(20)))
+    IncrementalIncidentLoader(path).refresh()
+
+    built = []
+    original = IncidentCube.from_frame.__func__
+    monkeypatch.setattr(IncidentCube, "from_frame", classmethod(lambda cls, frame: built.append(1) or original(cls, frame)))
+
+    loader = IncrementalIncidentLoader(path)
+    loader.refresh()
+    assert built == []
+    assert loader.cube.rows == 20
+
+
+def test_cube_saved_with_an_older_layout_is_rebuilt(tmp_path, monkeypatch):
+    path = str(tmp_path / "incidents.csv")
+    _write(path, HEADER + "".join(_row(i) for i in range(20)))
+    IncrementalIncidentLoader(path).refresh()
+
+    # Meta written before cubes recorded their layout
+    meta_path = cube_path_for(path) + '.json'
+    with open(meta_path) as f:
+        meta = json.load(f)
+    del meta['layout']
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    assert IncidentCube.load(cube_path_for(path)) is None
+
+    built = []
+    original = IncidentCube.from_frame.__func__
+    monkeypatch.setattr(IncidentCube, "from_frame", classmethod(lambda cls, frame: built.append(1) or original(cls, frame)))
+    IncrementalIncidentLoader(path).refresh()
+    assert built == [1]
+    assert IncidentCube.load(cube_path_for(path)).rows == 20
@@ -0,0 +1,39 @@
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from quiz_store import QuizStore
+
+
+def _stores(tmp_path, n):
+    # Separate connections to one file behave like separate processes
+    path = str(tmp_path / "scores.sqlite3")
+    legacy = str(tmp_path / "missing.json")
+    return [QuizStore(path, legacy_path=legacy) for _ in range(n)]
+
+
+def test_concurrent_adds_keep_stats_consistent(tmp_path):
+    stores = _stores(tmp_path, 3)
+    results = [(i % 5, 5, f"user-{i % 7}") for i in range(300)]
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        records = list(pool.map(lambda item: stores[item[0] % 3].add(*item[1]), enumerate(results)))
+
+    store = stores[0]
+    stats = store.stats()
+    percentages = [row["percentage"] for row in store.recent(limit=1000)]
+    assert store.count() == stats.count == len(percentages) == 300
+    assert len({record["id"] for record in records}) == 300
+    assert stats.running.mean == pytest.approx(statistics.mean(percentages))
+    assert stats.running.variance == pytest.approx(statistics.variance(percentages))
+    assert stats.histogram.total == 300
+    assert [entry["percentage"] for entry in store.leaderboard()] == sorted(percentages, reverse=True)[:10]
+
+
+def test_stats_match_history_per_user(tmp_path):
+    store, = _stores(tmp_path, 1)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: store.add(i % 4, 4, user="a" if i % 2 else "b"), range(100)))
+    assert len(store.history("a")) == len(store.history("b")) == 50
+    assert store.stats().count == 100
@@ -0,0 +1,92 @@
+import time
+import threading
+
+import pytest
+
+import ai_client
+from request_engine import RequestEngine
+from mock_llm_server import start_mock_server
+
+
+class FakeRateLimit(Exception):
+    status_code = 429
+
+    class response:
+        headers = {"retry-after": "0.3"}
+
+
+def test_identical_jobs_share_one_call():
+    engine = RequestEngine(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        release.wait(5)
+        return "answer"
+
+    first, first_new = engine.submit("same", call, session_id="a")
+    second, second_new = engine.submit("same", call, session_id="b")
+    release.set()
+
+    assert (first_new, second_new) == (True, False)
+    assert first.result(5) == second.result(5) == "answer"
+    assert len(calls) == 1
+    assert engine.stats()["coalesced"] == 1
+
+
+def test_rate_limit_pauses_all_dispatch():
+    engine = RequestEngine(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+    attempts = []
+
+    def limited():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise FakeRateLimit()
+        return "ok"
+
+    started = time.monotonic()
+    assert engine.run("limited", limited, session_id="a", timeout=5) == "ok"
+    # A job queued by another session after the 429 also waits out the cooldown
+    other_started = []
+    engine.run("other", lambda: other_started.append(time.monotonic()), session_id="b", timeout=5)
+
+    assert engine.stats()["rate_limited"] == 1
+    assert attempts[1] - started >= 0.3
+    assert other_started[0] - started >= 0.3
+
+
+def test_rate_limit_retries_give_up():
+    engine = RequestEngine(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+    FakeRateLimit.response.headers = {"retry-after": "0.01"}
+    try:
+        with pytest.raises(FakeRateLimit):
+            engine.run("always", lambda: (_ for _ in ()).throw(FakeRateLimit()), timeout=5)
+    finally:
+        FakeRateLimit.response.headers = {"retry-after": "0.3"}
+    assert engine.stats()["rate_limited"] == 3
+
+
+def test_sdk_429s_reach_the_engine(monkeypatch):
+    server = start_mock_server(profile="instant", seed=1, error_rate=1.0, error_statuses=[429])
+    host, port = server.server_address[:2]
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://{host}:{port}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    ai_client.reset_openai_client()
+    try:
+        engine = RequestEngine(requests_per_minute=6000, tokens_per_minute=10**6, max_concurrency=4)
+
+        def call():
+            return ai_client.get_dispatch_client().chat.completions.create(
+                model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hi"}]
+            )
+
+        with pytest.raises(Exception) as error:
+            engine.run("chat", call, timeout=30)
+        assert getattr(error.value, "status_code", None) == 429
+        # One attempt plus three engine retries, none hidden inside the SDK
+        assert engine.stats()["rate_limited"] == 3
+        assert server.state.requests == 4
+    finally:
+        ai_client.reset_openai_client()
+        server.shutdown()
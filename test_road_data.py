@@ -0,0 +1,18 @@
+from road_data import read_road_csv
+
+HEADER = b"RoadID, RoadName, SpeedLimit, AccidentPreventionMeasures, Lighting\n"
+
+
+def test_measures_are_matched_from_both_ends():
+    table = read_road_csv(HEADER + b"1, Main St, 35, Crosswalks, Speed Bumps, Adequate\n2, Elm St, 25, , Poor\n")
+    assert table.frame['Lighting'].tolist() == ['Adequate', 'Poor']
+    assert table.measures_for(0) == ['Crosswalks', 'Speed Bumps']
+    assert table.measures_for(1) == []
+
+
+def test_short_rows_are_skipped(capsys):
+    table = read_road_csv(HEADER + b"1, Main St, 35, Crosswalks, Adequate\n2, Elm St\n3, Oak Ave, 45, Poor\n")
+    assert table.frame['RoadID'].tolist() == [1, 3]
+    assert table.frame['Lighting'].tolist() == ['Adequate', 'Poor']
+    assert table.measures_for(1) == []
+    assert "line 3" in capsys.readouterr().out
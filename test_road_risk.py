@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from road_risk import RoadRiskIndex
+
+
+def _roads():
+    return pd.DataFrame({
+        'RoadID': [1, 1, 2, 3, 4, 5],
+        'RoadName': ['Main St', 'Main St', 'Elm St', 'Oak Ave', 'Hwy 9', 'Pine Rd'],
+        'RoadType': ['Arterial', 'Arterial', 'Residential', 'Arterial', 'Highway', 'Residential'],
+        'SpeedLimit': [35, 35, 25, 45, 65, 25],
+        'Lanes': [4, 4, 2, 4, 6, 2],
+        'TrafficVolume': ['High', 'High', 'Low', 'Medium', 'High', 'Low'],
+        'Lighting': ['Adequate'] * 6,
+        'AccidentCount': [60, 60, 10, 30, 90, 5],
+        'FatalAccidents': [3, 3, 2, 1, 6, 0],
+    })
+
+
+def test_top_n_ranks_by_metric_with_road_id_tiebreak():
+    index = RoadRiskIndex.from_frame(_roads())
+    # Rates per 10k vehicles: 1 -> 20, 2 -> 20, 3 -> 20, 4 -> 30, 5 -> 10
+    assert index.top_n(5)['RoadID'].tolist() == [4, 1, 2, 3, 5]
+    assert index.top_n(2, by='FatalAccidents')['RoadID'].tolist() == [4, 1]
+    assert index.top_n(1, by='fatal_rate')['RoadID'].tolist() == [2]
+    with pytest.raises(KeyError):
+        index.top_n(by='speed')
+
+
+def test_speed_limit_range_is_inclusive_and_ordered():
+    index = RoadRiskIndex.from_frame(_roads())
+    assert index.speed_limit_range(25, 45)['RoadID'].tolist() == [2, 5, 1, 3]
+    assert index.speed_limit_range(50, 60).empty
+
+
+def test_road_type_lists_most_dangerous_first():
+    index = RoadRiskIndex.from_frame(_roads())
+    assert index.road_type('Arterial')['RoadID'].tolist() == [1, 3]
+    assert index.road_type('Residential', n=1)['RoadID'].tolist() == [2]
+    assert index.road_type('Bridge').empty
+    assert index.road(5)['RoadName'] == 'Pine Rd'
+    assert index.road(99) is None
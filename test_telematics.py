@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from telematics import VehicleDetector, TelematicsEngine, simulate_drive
+
+
+def _batches(samples, bounds):
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        yield {field: values[start:stop] for field, values in samples.items()}
+
+
+def _run(samples, bounds, **kwargs):
+    detector = VehicleDetector("car-1", **kwargs)
+    events = []
+    for batch in _batches(samples, bounds):
+        events.extend(detector.process(batch))
+    return [(event['type'], event['timestamp'], round(event['value'], 9)) for event in events]
+
+
+def _splits(n, seed):
+    rng = np.random.default_rng(seed)
+    yield [0, n]
+    for size in (1, 7, 20, 333):
+        yield list(range(0, n, size)) + [n]
+    cuts = np.sort(rng.choice(np.arange(1, n), size=40, replace=False))
+    yield [0, *cuts.tolist(), n]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_alerts_do_not_depend_on_batching(seed):
+    samples = simulate_drive(duration=120, hz=10, seed=seed)
+    n = len(samples['timestamp'])
+    splits = list(_splits(n, seed))
+    expected = _run(samples, splits[0])
+    assert {event[0] for event in expected} == {
+        'speeding', 'sudden_brake', 'sharp_turn', 'lane_departure', 'phone_use'}
+    for bounds in splits[1:]:
+        assert _run(samples, bounds) == expected
+
+
+def test_lane_camera_and_road_limits_do_not_depend_on_batching():
+    samples = simulate_drive(duration=60, hz=10, seed=3, events=('lane_departure',))
+    n = len(samples['timestamp'])
+    samples['lane_offset'] = np.where(np.arange(n) % 200 < 30, 0.9, 0.1)
+    # Road 2 has a lower limit, so the car is speeding while it is on it
+    samples['road_id'] = np.where(np.arange(n) < n // 2, 1, 2)
+    samples['speed_limit'] = np.full(n, np.nan)
+    limits = {1: 45.0, 2: 25.0}
+
+    splits = list(_splits(n, 3))
+    expected = _run(samples, splits[0], speed_limits=limits)
+    assert {event[0] for event in expected} >= {'lane_departure', 'speeding'}
+    for bounds in splits[1:]:
+        assert _run(samples, bounds, speed_limits=limits) == expected
+
+
+def test_engine_keeps_vehicles_apart():
+    engine = TelematicsEngine()
+    drive = simulate_drive(duration=60, hz=10, seed=4)
+    quiet = simulate_drive(duration=60, hz=10, seed=4, events=())
+    for batch, quiet_batch in zip(_batches(drive, [0, 200, 400, 600]), _batches(quiet, [0, 200, 400, 600])):
+        engine.process("busy", batch)
+        assert engine.process("quiet", quiet_batch) == []
+    assert len(engine) == 2
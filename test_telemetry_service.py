@@ -0,0 +1,85 @@
+import json
+import time
+import socket
+
+from telemetry_service import TelemetryService
+
+
+def _send(service, samples):
+    with socket.create_connection((service.host, service.port)) as conn:
+        conn.sendall(b"".join(json.dumps(sample).encode("utf-8") + b"\n" for sample in samples))
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_unhashable_vehicle_id_is_rejected():
+    service = TelemetryService("127.0.0.1", 0).start_in_background()
+    try:
+        _send(service, [
+            {"vehicle_id": ["car", 1], "timestamp": 0.0, "speed": 30.0},
+            {"vehicle_id": {"car": 1}, "timestamp": 0.0, "speed": 30.0},
+            {"vehicle_id": "car-1", "timestamp": 0.0, "speed": 30.0},
+        ])
+        _wait_for(lambda: service.stats()["processed"] == 1)
+        stats = service.stats()
+        assert (stats["invalid"], stats["received"], stats["vehicles"]) == (2, 1, 1)
+    finally:
+        service.stop()
+
+
+def test_bad_numbers_and_backwards_timestamps_are_rejected():
+    service = TelemetryService("127.0.0.1", 0, max_latency=0.05).start_in_background()
+    try:
+        _send(service, [
+            {"vehicle_id": "car-1", "timestamp": 0.0, "speed": 30.0},
+            {"vehicle_id": "car-1", "timestamp": 0.1, "speed": "fast"},
+            {"vehicle_id": "car-1", "timestamp": 0.2, "speed": "31.5", "accel_x": None},
+            {"vehicle_id": "car-1", "timestamp": 0.1, "speed": 30.0},
+            {"vehicle_id": "car-1", "timestamp": "NaN", "speed": 30.0},
+            {"vehicle_id": "car-1", "timestamp": 0.3, "speed": 32.0},
+        ])
+        _wait_for(lambda: service.stats()["processed"] == 3)
+        stats = service.stats()
+        assert (stats["invalid"], stats["received"]) == (3, 3)
+        assert service.engine.detector("car-1").samples == 3
+    finally:
+        service.stop()
+
+
+def test_stop_ends_the_service_thread():
+    service = TelemetryService("127.0.0.1", 0).start_in_background()
+    conn = socket.create_connection((service.host, service.port))
+    try:
+        _wait_for(lambda: service.stats()["connections"] == 1)
+        service.stop()
+        assert not service._thread.is_alive()
+        assert service._worker.cancelled()
+        assert conn.recv(1) == b""
+    finally:
+        conn.close()
+    service.stop()
+
+
+def test_idle_vehicles_are_evicted(monkeypatch):
+    monkeypatch.setattr("telemetry_service.IDLE_SWEEP_INTERVAL", 0.05)
+    service = TelemetryService("127.0.0.1", 0, max_latency=0.05, idle_timeout=0.2).start_in_background()
+    try:
+        _send(service, [{"vehicle_id": f"car-{i}", "timestamp": 0.0, "speed": 30.0} for i in range(3)])
+        _wait_for(lambda: service.stats()["processed"] == 3)
+        assert len(service.engine) == 3
+
+        _wait_for(lambda: service.stats()["vehicles"] == 0)
+        assert service.stats()["evicted"] == 3
+        assert len(service.engine) == 0
+    finally:
+        service.stop()
+
+
+def test_road_speed_limits_reach_the_detectors():
+    service = TelemetryService("127.0.0.1", 0, speed_limits={7: 25.0})
+    assert service.engine.detector("car-1").speed_limits == {7: 25.0}
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from incident_ingest import IncrementalIncidentLoader
+from weather import (
+    enrich_with_weather, generate_synthetic_weather_parallel, iter_synthetic_weather_chunks,
+    synthetic_weather_rows,
+)
+
+HEADER = "IncidentID,Age,TimeOfDay,DayOfWeek,WeatherCondition,Distraction,Speeding,SeatbeltUsed,Fatality\n"
+CHUNK = 16
+SEED = 3
+
+
+def _row(i):
+    return f"INC{i:04d},{16 + i % 10},Evening,Friday,Clear,Phone,No,Yes,Yes\n"
+
+
+def _attach_weather(block):
+    # Same as App_UI._attach_weather, with a chunk size small enough to straddle
+    start = int(block.index[0]) if len(block) else 0
+    return enrich_with_weather(block, weather=synthetic_weather_rows(start, start + len(block), CHUNK, SEED))
+
+
+def test_serial_parallel_and_row_slices_agree():
+    serial = pd.concat(list(iter_synthetic_weather_chunks(100, CHUNK, SEED)))
+    parallel = generate_synthetic_weather_parallel(100, workers=3, chunk_size=CHUNK, seed=SEED)
+    pd.testing.assert_frame_equal(serial, parallel)
+    pd.testing.assert_frame_equal(serial, synthetic_weather_rows(0, 100, CHUNK, SEED))
+    pd.testing.assert_frame_equal(serial.loc[37:81], synthetic_weather_rows(37, 82, CHUNK, SEED))
+
+
+def test_append_gets_the_same_weather_as_a_cold_load(tmp_path):
+    path = str(tmp_path / "incidents.csv")
+    with open(path, "w") as f:
+        f.write(HEADER + "".join(_row(i) for i in range(59)))
+    loader = IncrementalIncidentLoader(path, enrich=_attach_weather)
+    loader.refresh()
+    with open(path, "a") as f:
+        f.write("".join(_row(i) for i in range(59, 100)))
+    appended = loader.refresh()
+
+    cold = IncrementalIncidentLoader(path, enrich=_attach_weather)
+    cold_frame = cold.refresh()
+    assert len(appended) == 100
+    pd.testing.assert_frame_equal(
+        appended[['temperature', 'weather_condition']], cold_frame[['temperature', 'weather_condition']])
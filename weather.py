@@ -0,0 +1,193 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+WEATHER_CONDITIONS = ['Clear', 'Rain', 'Snow', 'Fog']
+MEAN_TEMPERATURE = 20
+TEMPERATURE_SPREAD = 5
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+def _chunk_rng(seed, chunk_index):
+    """
+    Independent generator for one chunk.
+
+    Each chunk gets its own child SeedSequence keyed on its position, so a
+    chunk's rows are the same no matter which worker produces it.
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+
+def _weather_frame(rng, size):
+    temperatures = rng.normal(MEAN_TEMPERATURE, TEMPERATURE_SPREAD, size)
+    codes = rng.integers(0, len(WEATHER_CONDITIONS), size, dtype=np.int8)
+    conditions = pd.Categorical.from_codes(codes, categories=WEATHER_CONDITIONS)
+    return pd.DataFrame({
+        'temperature': temperatures,
+        'weather_condition': conditions
+    })
+
+
+def _weather_chunk(seed, index, chunk_size):
+    """
+    Chunk `index` of the (seed, chunk_size) stream, indexed by global row.
+
+    A chunk is always drawn at its full length, since drawing fewer normals
+    would leave the generator in a different state for the conditions.
+    Callers slice off the rows they need.
+    """
+    frame = _weather_frame(_chunk_rng(seed, index), chunk_size)
+    frame.index = pd.RangeIndex(index * chunk_size, (index + 1) * chunk_size)
+    return frame
+
+
+def generate_synthetic_weather_data(size, seed=None):
+    """Generate synthetic weather data for analysis
+
+    Pass a seed to get the same rows on every worker. Without one, rows
+    come from fresh OS entropy.
+    """
+    return _weather_frame(np.random.default_rng(seed), size)
+
+
+def iter_synthetic_weather_chunks(size, chunk_size=DEFAULT_CHUNK_SIZE, seed=0, start_chunk=0, stop_chunk=None):
+    """
+    Yield `size` rows of weather as DataFrames of at most `chunk_size` rows.
+
+    Output is fully determined by (seed, chunk_size) and matches
+    synthetic_weather_rows(0, size, chunk_size, seed). start_chunk/stop_chunk
+    select a slice of the chunks so several processes can share one stream.
+    """
+    n_chunks = -(-size // chunk_size)
+    if stop_chunk is None or stop_chunk > n_chunks:
+        stop_chunk = n_chunks
+
+    for index in range(start_chunk, stop_chunk):
+        rows = min(chunk_size, size - index * chunk_size)
+        frame = _weather_chunk(seed, index, chunk_size)
+        yield frame if rows == chunk_size else frame.iloc[:rows]
+
+
+def synthetic_weather_rows(start, stop, chunk_size=DEFAULT_CHUNK_SIZE, seed=0):
+    """
+    Rows [start, stop) of the synthetic weather stream for (seed, chunk_size).
+
+    Row i always comes from chunk i // chunk_size, so a row's weather does
+    not depend on which slice of the stream it was requested in, and agrees
+    with iter_synthetic_weather_chunks() and the parallel generator.
+    """
+    if stop <= start:
+        return _weather_frame(_chunk_rng(seed, 0), 0)
+    frames = [_weather_chunk(seed, index, chunk_size)
+              for index in range(start // chunk_size, -(-stop // chunk_size))]
+    weather = pd.concat(frames) if len(frames) > 1 else frames[0]
+    return weather.loc[start:stop - 1]
+
+
+def _write_partition(args):
+    size, chunk_size, seed, start_chunk, stop_chunk, out_path = args
+    frames = iter_synthetic_weather_chunks(size, chunk_size, seed, start_chunk, stop_chunk)
+    if out_path is None:
+        return pd.concat(list(frames))
+
+    # Writing straight to disk keeps 100M-row runs out of the parent process
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    table = pa.concat_tables(pa.Table.from_pandas(frame, preserve_index=False) for frame in frames)
+    feather.write_feather(table, out_path)
+    return out_path
+
+
+def generate_synthetic_weather_parallel(size, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, seed=0, out_dir=None):
+    """
+    Generate weather on several processes.
+
+    The chunks are split into contiguous ranges, one per worker, so the
+    result is identical to iter_synthetic_weather_chunks() with the same seed.
+    Returns a DataFrame, or a list of Arrow partition paths when out_dir is set.
+    """
+    workers = workers or os.cpu_count() or 1
+    n_chunks = -(-size // chunk_size)
+    per_worker = -(-n_chunks // workers) if n_chunks else 0
+
+    jobs = []
+    for part, start in enumerate(range(0, n_chunks, per_worker or 1)):
+        out_path = None
+        if out_dir is not None:
+            os.makedirs(out_dir, exist_ok=True)
+            out_path = os.path.join(out_dir, f"weather-{part:05d}.arrow")
+        jobs.append((size, chunk_size, seed, start, start + per_worker, out_path))
+
+    if not jobs:
+        return [] if out_dir is not None else _weather_frame(_chunk_rng(seed, 0), 0)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        results = list(pool.map(_write_partition, jobs))
+
+    if out_dir is not None:
+        return results
+    return pd.concat(results)
+
+
+def attach_weather_columns(incidents, weather):
+    """
+    Glue a same-length weather frame onto incidents row by row.
+
+    The weather columns are re-labelled with the incident index and placed
+    alongside the existing columns without a join or a copy of the data.
+    """
+    if len(weather) != len(incidents):
+        raise ValueError(
+            f"Positional weather has {len(weather)} rows but there are {len(incidents)} incidents")
+
+    columns = {name: incidents[name] for name in incidents.columns}
+    for name in weather.columns:
+        columns[name] = pd.Series(weather[name].array, index=incidents.index, name=name, copy=False)
+    return pd.DataFrame(columns, index=incidents.index, copy=False)
+
+
+def join_weather(incidents, weather, on='timestamp', bucket='1h'):
+    """
+    Join a real weather table onto incidents by key.
+
+    With a datetime `on` column both sides are floored to `bucket`, sorted
+    and matched with a sort-merge (pd.merge_asof), taking the latest weather
+    observation within one bucket. Any other keys (e.g. ['DayOfWeek',
+    'TimeOfDay']) use a left join against the weather table, which must have
+    one row per key. Incidents keep their original order and index.
+    """
+    keys = [on] if isinstance(on, str) else list(on)
+    weather_columns = [col for col in weather.columns if col not in keys]
+
+    if len(keys) == 1 and pd.api.types.is_datetime64_any_dtype(incidents[keys[0]]):
+        key = keys[0]
+        left = pd.DataFrame({'_bucket': incidents[key].dt.floor(bucket), '_row': np.arange(len(incidents))})
+        left = left.sort_values('_bucket', kind='stable')
+        right = weather[weather_columns].assign(_bucket=weather[key].dt.floor(bucket))
+        right = right.sort_values('_bucket', kind='stable')
+        matched = pd.merge_asof(
+            left, right, on='_bucket', direction='backward', tolerance=pd.Timedelta(bucket))
+        matched = matched.sort_values('_row')
+    else:
+        left = incidents[keys].reset_index(drop=True)
+        matched = left.merge(weather, on=keys, how='left', sort=False, validate='many_to_one')
+
+    matched.index = incidents.index
+    return attach_weather_columns(incidents, matched[weather_columns])
+
+
+def enrich_with_weather(incidents, weather=None, on=None, bucket='1h', seed=None):
+    """
+    Add weather columns to incident rows.
+
+    Without a weather table, synthetic weather is generated and attached by
+    position. With a table and no `on`, the table is attached by position.
+    With `on`, the table is joined by key (see join_weather).
+    """
+    if weather is None:
+        weather = generate_synthetic_weather_data(len(incidents), seed=seed)
+    if on is None:
+        return attach_weather_columns(incidents, weather)
+    return join_weather(incidents, weather, on=on, bucket=bucket)